@@ -74,12 +74,14 @@ def __filter(
         corresponding to fault data.
     """
     # Get the indices of sw_data which correspond to the passed sw_codes:
-    sw_data_indices = np.array([], dtype='i')
+    # (np.where results are already sorted, so only the combined
+    # indices need sorting, once, after the loop)
+    partial = [np.array([], dtype='i')]
     for sw_code in sw_codes:
         sw = np.where((
             sw_data[sw_column_name] == sw_code))
-        sw_data_indices = np.sort(
-            np.concatenate((sw_data_indices, sw[0])))
+        partial.append(sw[0])
+    sw_data_indices = np.sort(np.concatenate(partial))
     print('sw data length: ', len(sw_data_indices))
 
     if filter_type == 'fault_free':
@@ -143,7 +145,7 @@ def __fault_free_filter(scada_data, sw_data, sw_data_indices, time_delta_1,
     fault_free_scada_indices: ndarray
         indices of scada_data which correspond to fault-free operation
     """
-    fault_free_scada_indices = np.array([], dtype='i')
+    fault_free_scada_indices = [np.array([], dtype='i')]
     for sw_data_index in sw_data_indices:
         # fault_free_scada_indices for fault-free data are normally
         # between time_delta_1 AFTER each instance of
@@ -168,10 +170,10 @@ def __fault_free_filter(scada_data, sw_data, sw_data_indices, time_delta_1,
                 (scada_data['Time'] <
                     scada_data['Time'][-1] - time_delta_2))
 
-        fault_free_scada_indices = np.concatenate(
-            (fault_free_scada_indices, sf[0]), axis=0)
+        fault_free_scada_indices.append(sf[0])
 
-    fault_free_scada_indices = np.unique(fault_free_scada_indices)
+    fault_free_scada_indices = np.unique(
+        np.concatenate(fault_free_scada_indices))
 
     return fault_free_scada_indices
 
@@ -210,7 +212,7 @@ def __fault_case_1_filter(scada_data, sw_data, sw_data_indices, time_delta_1,
     fault_scada_indices: ndarray
         indices of scada_data which correspond to fault-free operation
     """
-    fault_scada_indices = np.array([], dtype='i')
+    fault_scada_indices = [np.array([], dtype='i')]
 
     for sw_data_index in sw_data_indices:
         # fault_scada_indices for fault data are normally
@@ -236,10 +238,9 @@ def __fault_case_1_filter(scada_data, sw_data, sw_data_indices, time_delta_1,
                 (scada_data['Time'] <
                     scada_data['Time'][-1]))
 
-        fault_scada_indices = np.concatenate(
-            (fault_scada_indices, sf[0]), axis=0)
+        fault_scada_indices.append(sf[0])
 
-    fault_scada_indices = np.unique(fault_scada_indices)
+    fault_scada_indices = np.unique(np.concatenate(fault_scada_indices))
 
     return fault_scada_indices
 
@@ -282,7 +283,7 @@ def __fault_case_2_filter(scada_data, sw_data, sw_data_indices, time_delta_1,
     if time_delta_1 < time_delta_2:
         raise ValueError("time_delta_1 must be greater than or equal to "
                          "time_delta_2!")
-    fault_scada_indices = np.array([], dtype='i')
+    fault_scada_indices = [np.array([], dtype='i')]
     # fault_scada_indices for fault data are between time_delta_1
     # and time_delta_2 before each instance of sw_data_indices:
     for sw_data_index in sw_data_indices:
@@ -292,10 +293,9 @@ def __fault_case_2_filter(scada_data, sw_data, sw_data_indices, time_delta_1,
             (scada_data['Time'] <
                 sw_data['Time'][sw_data_index] - time_delta_2))
 
-        fault_scada_indices = np.concatenate(
-            (fault_scada_indices, sf[0]), axis=0)
+        fault_scada_indices.append(sf[0])
 
-    fault_scada_indices = np.unique(fault_scada_indices)
+    fault_scada_indices = np.unique(np.concatenate(fault_scada_indices))
 
     return fault_scada_indices
 
@@ -340,7 +340,7 @@ def __fault_case_3_filter(scada_data, sw_data, sw_data_indices, time_delta_1,
     if time_delta_1 < time_delta_2:
         raise ValueError("time_delta_1 must be greater than or equal to "
                          "time_delta_2!")
-    fault_scada_indices = np.array([], dtype='i')
+    fault_scada_indices = [np.array([], dtype='i')]
     # filtered_scada_instances for fault data are only returned
     # between time_delta_1 and time_delta_2 before a fault, if the
     # same type of fault does not occur in that period.
@@ -365,9 +365,8 @@ def __fault_case_3_filter(scada_data, sw_data, sw_data_indices, time_delta_1,
                 (scada_data['Time'] <
                     sw_data['Time'][sw_data_indices[i]] - time_delta_2))
 
-            fault_scada_indices = np.concatenate(
-                (fault_scada_indices, sf[0]))
+            fault_scada_indices.append(sf[0])
 
-    fault_scada_indices = np.unique(fault_scada_indices)
+    fault_scada_indices = np.unique(np.concatenate(fault_scada_indices))
 
     return fault_scada_indices
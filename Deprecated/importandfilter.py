@@ -2,9 +2,8 @@ import numpy as np
 import matplotlib.pyplot as plt
 import datetime as dt
 import pandas as pd
-import numpy.lib.recfunctions as rec
 
-from scipy.interpolate import splev, splrep
+from scipy.interpolate import splev
 from sklearn import datasets
 from sklearn.cross_validation import train_test_split
 from sklearn.grid_search import GridSearchCV, RandomizedSearchCV
@@ -13,6 +12,98 @@ from sklearn.svm import SVC, OneClassSVM
 from sklearn import preprocessing as prep
 
 
+def read_csv_data(csv_file, dtype, extra_fields=(), chunk_size=100000):
+    """Reads a csv file into a structured array, using the pandas C
+    parser rather than the much slower np.genfromtxt. Dates in the
+    'Time' column are converted to Unix timestamps.
+
+    Parameters
+    ----------
+    csv_file: str
+        The csv file to be read. Its first line must be the header.
+    dtype: tuple of str
+        The dtype of each field in the returned array, in the same
+        order as the csv columns. 'Time' should be a float type.
+    extra_fields: list of (name, dtype) tuples, optional
+        Fields to add after the csv columns. These are left
+        uninitialised, to be filled in by the caller.
+    chunk_size: int, optional
+        The number of csv rows to parse at a time. Only one chunk is
+        held as a DataFrame at once, which limits the memory used.
+
+    Returns
+    -------
+    data: ndarray
+        The csv data as a structured array
+    """
+    # parse just the header (and first row) with genfromtxt, so the
+    # field names are cleaned up exactly the same as they always were:
+    with open(csv_file, 'rb') as f:
+        names = np.genfromtxt(
+            f, dtype=None, delimiter=",", names=True,
+            max_rows=1).dtype.names
+    dtype = np.dtype(list(zip(names, dtype)) + list(extra_fields))
+
+    # count the rows first, so the final array can be allocated once
+    with open(csv_file, 'rb') as f:
+        n_rows = sum(1 for _ in f) - 1
+    data = np.empty(n_rows, dtype=dtype)
+
+    # fill in the final array field by field, one chunk at a time, rather
+    # than building an intermediate array and then copying it all over
+    # with astype
+    n_read = 0
+    for csv_chunk in pd.read_csv(
+            csv_file, header=0, names=names, engine='c',
+            chunksize=chunk_size, dtype={
+                name: str if name == 'Time' or dtype[name].kind in 'Uib'
+                else dtype[name] for name in names}):
+        data_chunk = data[n_read:n_read + len(csv_chunk)]
+        for name in names:
+            if name == 'Time':
+                data_chunk[name] = unix_time(csv_chunk[name])
+            elif dtype[name].kind == 'U':
+                data_chunk[name] = csv_chunk[name].fillna('').values
+            elif dtype[name].kind == 'i':
+                # read_csv can't give blank integers, so they're read as
+                # strings. Like genfromtxt, blank (or unreadable) ones are
+                # -1, and any decimals are truncated
+                data_chunk[name] = pd.to_numeric(
+                    csv_chunk[name], errors='coerce').fillna(-1).values
+            elif dtype[name].kind == 'b':
+                # genfromtxt only reads 'true' (in any case) as True.
+                # Anything else, including blanks and '1', is False
+                data_chunk[name] = (
+                    csv_chunk[name].str.lower() == 'true').values
+            else:
+                data_chunk[name] = csv_chunk[name].values
+        n_read += len(csv_chunk)
+
+    # (blank lines are counted above, but skipped by read_csv)
+    return data[:n_read]
+
+
+def unix_time(time):
+    """Converts date strings to Unix timestamps.
+
+    Parameters
+    ----------
+    time: pandas Series of str
+        Dates in the format "%d/%m/%Y %H:%M:%S"
+
+    Returns
+    -------
+    unix_time: ndarray
+        The dates as Unix timestamps, in seconds
+    """
+    # parse every date at once, rather than with strptime row by row.
+    # cache=True means repeated dates are only parsed once:
+    time = pd.to_datetime(time, format="%d/%m/%Y %H:%M:%S", cache=True)
+    time = time - pd.Timestamp(dt.datetime.fromtimestamp(3600))
+
+    return np.asarray(time.dt.total_seconds())
+
+
 def import_data(
     scada_data='Source Data/SCADA_data.csv',
         status_data_wec='Source Data/status_data_wec.csv',
@@ -59,73 +150,31 @@ def import_data(
     SCADA_data.csv contains the wsd, 03d and 04d data files all combined
     together.
     """
-    SCADA = np.genfromtxt(open(scada_data, 'rb'), dtype=(
-        '<U19', '<f4', '<f4', '<f4', '<f4', '<f4', '<f4', '<f4', '<f4',
+    SCADA = read_csv_data(scada_data, dtype=(
+        '<f4', '<f4', '<f4', '<f4', '<f4', '<f4', '<f4', '<f4', '<f4',
         '<f4', '<f4', '<f4', '<f4', '<f4', '<f4', '<f4', '<f4', '<f4',
         '<f4', '<f4', '<f4', '<f4', '<f4', '<f4', '<f4', '<f4', '<f4',
         '<f4', '<f4', '<f4', '<f4', '<f4', '<f4', '<f4', '<f4', '<f4',
         '<f4', '<f4', '<f4', '<f4', '<f4', '<f4', '<f4', '<f4', '<f4',
         '<f4', '<f4', '<f4', '<f4', '<f4', '<f4', '<f4', '<f4', '<f4',
         '<f4', '<f4', '<f4', '<f4', '<f4', '<f4', '<f4', '<f4', '<f4'),
-        delimiter=",", names=True)
-
-    status_wec = np.genfromtxt(open(status_data_wec, 'rb'), dtype=(
-        '<U19', '<i4', '<i4', '<U9', '<U63', '<i4', '|b1', '|b1', '<f4'),
-        delimiter=",", names=True)
-
-    status_rtu = np.genfromtxt(open(status_data_rtu, 'rb'), dtype=(
-        '<U19', '<i4', '<i4', '<U9', '<U63', '<i4', '|b1', '|b1', '<f4'),
-        delimiter=",", names=True)
+        extra_fields=[('Inverter_averages', '<f4'),
+                      ('Inverter_std_dev', '<f4')])
 
-    warning_wec = np.genfromtxt(open(warning_data_wec, 'rb'), dtype=(
-        '<U19', '<i4', '<i4', '<U9', '<U63', '|b1', '<f4'),
-        delimiter=",", names=True)
+    status_wec = read_csv_data(status_data_wec, dtype=(
+        '<f4', '<i4', '<i4', '<U9', '<U63', '<i4', '|b1', '|b1', '<f4'))
 
-    warning_rtu = np.genfromtxt(open(warning_data_rtu, 'rb'), dtype=(
-        '<U19', '<i4', '<i4', '<U9', '<U63', '|b1', '<f4'),
-        delimiter=",", names=True)
+    status_rtu = read_csv_data(status_data_rtu, dtype=(
+        '<f4', '<i4', '<i4', '<U9', '<U63', '<i4', '|b1', '|b1', '<f4'))
 
-    # Convert dates in the files to UNIX timestamps
+    warning_wec = read_csv_data(warning_data_wec, dtype=(
+        '<f4', '<i4', '<i4', '<U9', '<U63', '|b1', '<f4'))
 
-    data_files = (SCADA, status_rtu, status_wec, warning_rtu, warning_wec)
+    warning_rtu = read_csv_data(warning_data_rtu, dtype=(
+        '<f4', '<i4', '<i4', '<U9', '<U63', '|b1', '<f4'))
 
-    for data_file in data_files:
-        # Convert datetimes to Unix timestamps (as strings)
-        time = data_file['Time']
-        for i in range(0, len(time)):
-            t = dt.datetime.strptime(time[i], "%d/%m/%Y %H:%M:%S")
-            t = (t - dt.datetime.fromtimestamp(3600)).total_seconds()
-            time[i] = t
-
-    # convert Unix timestamp string to float (for some reason this
-    # doesn't work when in the loop above)
-
-    dtlist = SCADA.dtype.descr
-    dtlist[0] = (dtlist[0][0], '<f4')
-    dtlist = np.dtype(dtlist)
-    SCADA = SCADA.astype(dtlist)
-
-    dtlist = status_wec.dtype.descr
-    dtlist[0] = (dtlist[0][0], '<f4')
-    dtlist = np.dtype(dtlist)
-    status_wec = status_wec.astype(dtlist)
-
-    dtlist = status_rtu.dtype.descr
-    dtlist[0] = (dtlist[0][0], '<f4')
-    dtlist = np.dtype(dtlist)
-    status_rtu = status_rtu.astype(dtlist)
-
-    dtlist = warning_wec.dtype.descr
-    dtlist[0] = (dtlist[0][0], '<f4')
-    dtlist = np.dtype(dtlist)
-    warning_wec = warning_wec.astype(dtlist)
-
-    dtlist = warning_rtu.dtype.descr
-    dtlist[0] = (dtlist[0][0], '<f4')
-    dtlist = np.dtype(dtlist)
-    warning_rtu = warning_rtu.astype(dtlist)
-
-    # Add 2 extra columns - Inverter_averages and Inverter_std_dev, as features
+    # Fill in the 2 extra columns - Inverter_averages and
+    # Inverter_std_dev, as features
     inverters = np.array([
         'CS101__Sys_1_inverter_1_cabinet_temp',
         'CS101__Sys_1_inverter_2_cabinet_temp',
@@ -138,10 +187,13 @@ def import_data(
         'CS101__Sys_2_inverter_2_cabinet_temp',
         'CS101__Sys_2_inverter_3_cabinet_temp',
         'CS101__Sys_2_inverter_4_cabinet_temp'])
-    means = pd.DataFrame(SCADA[inverters]).mean(axis=1).values
-    stds = pd.DataFrame(SCADA[inverters]).std(axis=1).values
-    SCADA = rec.append_fields(SCADA, ['Inverter_averages', 'Inverter_std_dev'],
-                              data=[means, stds], usemask=False)
+    # stack the temperatures into a plain 2-D array, rather than going
+    # through a DataFrame. Missing values are skipped, as pandas did:
+    inverter_temps = np.column_stack([SCADA[name] for name in inverters])
+    SCADA['Inverter_averages'] = np.nanmean(
+        inverter_temps, axis=1, dtype=np.float64)
+    SCADA['Inverter_std_dev'] = np.nanstd(
+        inverter_temps, axis=1, ddof=1, dtype=np.float64)
 
     return SCADA, status_wec, status_rtu, warning_wec, warning_rtu
 
@@ -198,7 +250,13 @@ def power_curve_filtering(SCADA):
     # ------------------------------------------------------------------
     # --------------------------Algorithm loop start--------------------
     # ------------------------------------------------------------------
-    SCADA_loop = SCADA_real
+    # the algorithm only ever looks at the windspeed and power, so it
+    # works on plain arrays of those, and keeps track of which points of
+    # SCADA_real they are, rather than copying whole SCADA records on
+    # every iteration:
+    windspeed_real = np.ascontiguousarray(SCADA_real['WEC_ava_windspeed'])
+    power_real = np.ascontiguousarray(SCADA_real['WEC_ava_Power'])
+    loop_inds = np.arange(len(SCADA_real))
     # when terminate = True, the algorithm terminates
     terminate = False
     # initialise the standard deviation of the bins (empty array):
@@ -207,29 +265,36 @@ def power_curve_filtering(SCADA):
     k = 1
 
     while terminate is False:
+        windspeed_loop = windspeed_real[loop_inds]
+        power_loop = power_real[loop_inds]
+
         # --------1: set windspeed bins, width=1/loop iter no. (k)------
-        max_wind = np.ceil(np.nanmax(SCADA_loop['WEC_ava_windspeed']))
+        max_wind = np.ceil(np.nanmax(windspeed_loop))
         bin_width = 1 / k
         bins = np.arange(0, max_wind + bin_width, bin_width)
 
-        # initialise average and std arrays
-        SCADA_bin_averages = np.zeros(len(bins))
-        SCADA_bin_stds = np.zeros(len(bins))
-
         # --------2: get average and std for each bin ------------------
-        i = 0
-        for i in range(0, len(bins)):
-            SCADA_bin_averages[i] = np.mean(SCADA_loop[
-                np.where((SCADA_loop['WEC_ava_windspeed'] >=
-                          (bins[i] - bin_width / 2)) &
-                         (SCADA_loop['WEC_ava_windspeed'] <
-                          (bins[i] + bin_width / 2)))]['WEC_ava_Power'])
-            SCADA_bin_stds[i] = np.std(SCADA_loop[
-                np.where((SCADA_loop['WEC_ava_windspeed'] >=
-                          (bins[i] - bin_width / 2)) &
-                         (SCADA_loop['WEC_ava_windspeed'] <
-                          (bins[i] + bin_width / 2)))]['WEC_ava_Power'])
-            i = +1
+        # find the bin each point falls in (if any), so all the bins'
+        # stats can be summed up in one pass with np.bincount, rather
+        # than searching through every point once per bin:
+        windspeed = windspeed_loop
+        power = power_loop.astype(np.float64)
+        bin_lower = bins - bin_width / 2
+        bin_upper = bins + bin_width / 2
+        bin_inds = np.searchsorted(bin_lower, windspeed, side='right') - 1
+        in_bin = bin_inds >= 0
+        in_bin[in_bin] = windspeed[in_bin] < bin_upper[bin_inds[in_bin]]
+        bin_inds = bin_inds[in_bin]
+        power = power[in_bin]
+
+        bin_counts = np.bincount(bin_inds, minlength=len(bins))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # empty bins are left as nan, as np.mean/np.std give for them
+            SCADA_bin_averages = np.bincount(
+                bin_inds, weights=power, minlength=len(bins)) / bin_counts
+            SCADA_bin_stds = np.sqrt(np.bincount(
+                bin_inds, weights=(power - SCADA_bin_averages[bin_inds]) ** 2,
+                minlength=len(bins)) / bin_counts)
         SCADA_bin_stds_avg[k] = np.nanmean(SCADA_bin_stds)
 
         # --------3: create splines-------------------------------------
@@ -238,18 +303,21 @@ def power_curve_filtering(SCADA):
 
         x2 = np.round(np.arange(0.0, 20.1, 0.1), 1)
 
-        tck = splrep(x, y)
+        # the bin averages are used directly as the coefficients of a
+        # cubic b-spline, on the knots splrep would choose for the bins
+        # (these only depend on x, so there is no need to fit anything)
+        knots = np.concatenate(([x[0]] * 4, x[2:-2], [x[-1]] * 4))
+        coeffs = np.concatenate((y, np.zeros(4)))
 
-        tck_list = list(tck)
-        yl = y.tolist()
-        tck_list[1] = yl + [0.0, 0.0, 0.0, 0.0]
+        y2 = splev(x2, (knots, coeffs, 3))
 
-        y2 = splev(x2, tck_list)
+        # the point of the power curve each windspeed lies on doesn't
+        # change while the curve is shifted, so only look it up once
+        x2_inds, on_x2 = x2_indices(windspeed_loop, x2)
 
         # --------4: Find left/right shifts:----------------------------
 
-        # initialise SCADA_cur & PDL
-        SCADA_cur = SCADA_loop
+        # initialise PDL
         PDL = np.zeros(100)
         PDL[0] = 20
         j = 0
@@ -261,56 +329,43 @@ def power_curve_filtering(SCADA):
         while (PDL[j] - PDL[j - 1]) >= b_shift:
             j += 1
 
-            # create shifts
-            right_shift = np.round(x2 + (dv * j), 1)
-            left_shift = np.round(x2 - (dv * j), 1)
-
-            t_inds = np.array([])
+            # find where the upper and lower power limits are on the
+            # left/right curves at each windspeed. These are the
+            # upper/lower "y" values for the corresponding x value.
+            # x2 is spaced by dv, so shifting the curve by dv * j is the
+            # same as shifting y2 along by j places. Windspeeds with no
+            # shifted value (or a nan one) get a limit of zero
+            upper_limit_lr[:] = 0
+            upper_limit_lr[:len(x2) - j] = y2[j:]
+            upper_limit_lr[np.isnan(upper_limit_lr)] = 0
+
+            # this fixes the problem whereby the power curve is
+            # shifted left, so the final few "upper_limit_lr" values
+            # don't exist, so are shown as zeroes
+            no_upper = upper_limit_lr == 0
+            no_upper[:150] = False
+            upper_limit_lr[no_upper] = y2[no_upper]
+
+            lower_limit_lr[:] = 0
+            lower_limit_lr[j:] = y2[:len(x2) - j]
+            lower_limit_lr[np.isnan(lower_limit_lr)] = 0
 
             # find the points which lie inside the upper and lower power
             # limits for the shifted power curves
-            for i in range(0, len(x2)):
-                # find where the upper and lower power limits are on the
-                # left/right curves at the current windspeed. These are
-                # the upper/lower "y" values for the corresponding
-                # current x value
-                upper_limit_lr[i] = np.nansum(
-                    y2[np.where(left_shift == x2[i])])
-
-                # this fixes the problem whereby the power curve is
-                # shifted left, so the final few "upper_limit_lr" values
-                # don't exist, so are shown as zeroes
-                if (i >= 150) & (upper_limit_lr[i] == 0):
-                    upper_limit_lr[i] = y2[i]
-
-                lower_limit_lr[i] = np.nansum(
-                    y2[np.where(right_shift == x2[i])])
-
-                # get indices of points inside these lines
-                t_inds_cur = np.where(
-                    (SCADA_cur['WEC_ava_windspeed'] == x2[i]) &
-                    (SCADA_cur['WEC_ava_Power'] >= lower_limit_lr[i]))
-                t_inds = np.concatenate([t_inds, t_inds_cur[0]])
-
-            t_inds = t_inds.astype(int)
-
-            # make an array of these points
-            mask = np.array(False).repeat(len(SCADA_cur))
-            mask[t_inds] = True
-            SCADA_inside_wind = SCADA_cur[mask]
+            inside_wind = on_x2 & (power_loop >= lower_limit_lr[
+                x2_inds].astype(power_loop.dtype))
 
             # calculate PDL
-            PDL[j] = (len(SCADA_inside_wind) / len(SCADA_cur)) * 100
+            PDL[j] = (np.count_nonzero(inside_wind) / len(inside_wind)) * 100
 
         # --------5: Find up/down shifts:-------------------------------
 
-        # initialise SCADA_cur & PDL
+        # initialise PDL
         dP = 5
         y_offset = .03
         j = 0
         PDL = np.zeros(300)
         PDL[0] = 1
-        SCADA_cur2 = SCADA_cur
 
         while (PDL[j] - PDL[j - 1]) >= y_offset:
             j += 1
@@ -319,29 +374,17 @@ def power_curve_filtering(SCADA):
             upper_limit_ud = upper_limit_lr + (dP * j)
             lower_limit_ud = lower_limit_lr - (dP * j)
 
-            t_inds = np.array([])
-
             # find the points which lie inside the upper and lower power
             # limits for the shifted power curves
-            for i in range(0, len(x2)):
-                # get indices of points inside these lines
-                t_inds_cur = np.where(
-                    (SCADA_cur2['WEC_ava_windspeed'] == x2[i]) &
-                    (SCADA_cur2['WEC_ava_Power'] >= lower_limit_ud[i]))
-                t_inds = np.concatenate([t_inds, t_inds_cur[0]])
-
-            t_inds = t_inds.astype(int)
-
-            # make an array of these points
-            mask = np.array(False).repeat(len(SCADA_cur2))
-            mask[t_inds] = True
-            SCADA_inside_wind2 = SCADA_cur2[mask]
+            inside_wind2 = on_x2 & (power_loop >= lower_limit_ud[
+                x2_inds].astype(power_loop.dtype))
 
             # calculate PDL
-            PDL[j] = (len(SCADA_inside_wind2) / len(SCADA_cur2)) * 100
+            PDL[j] = (
+                np.count_nonzero(inside_wind2) / len(inside_wind2)) * 100
 
         # set the output as the input of the next loop
-        SCADA_loop = SCADA_inside_wind2
+        loop_inds = loop_inds[inside_wind2]
 
         # Check if the loop will be terminated
         a_loop = SCADA_bin_stds_avg[k] - SCADA_bin_stds_avg[k - 1]
@@ -356,19 +399,49 @@ def power_curve_filtering(SCADA):
     # ------------------------------------------------------------------
 
     # list out good SCADA indices:
-    SCADA_good_pc = SCADA_inside_wind2
+    SCADA_good_pc = SCADA_real[loop_inds]
 
     # list out bad SCADA indices:
-    bad_mask = np.array([True]).repeat(len(SCADA_real))
-
-    for time in SCADA_good_pc['Time']:
-        bad_mask[np.where(SCADA_real['Time'] == time)] = False
-    SCADA_bad_pc = SCADA_real[bad_mask]
+    # (any point with the same time as a good point isn't bad; these are
+    # looked up with a binary search of the sorted good times)
+    good_times = np.sort(SCADA_good_pc['Time'])
+    real_times = SCADA_real['Time']
+    good_inds = np.searchsorted(good_times, real_times)
+    is_good = good_inds < len(good_times)
+    is_good[is_good] = good_times[good_inds[is_good]] == real_times[is_good]
+    SCADA_bad_pc = SCADA_real[~is_good]
 
     return SCADA_good_pc, SCADA_bad_pc, SCADA_bin_averages, bins, x2, y2,
     upper_limit_ud, lower_limit_ud
 
 
+def x2_indices(windspeed, x2):
+    """Matches windspeeds up to the 0.1 m/s steps of the interpolated
+    power curve in `power_curve_filtering()`.
+
+    Parameters
+    ----------
+    windspeed: ndarray
+        Windspeeds of the SCADA data
+    x2: ndarray
+        The x points of the interpolated power curve, in 0.1 steps from 0
+
+    Returns
+    -------
+    x2_inds: ndarray
+        Index of x2 nearest to each windspeed (0 where there is none)
+    on_x2: ndarray
+        Boolean mask of the windspeeds which are exactly equal to
+        `x2[x2_inds]` (at the precision of `windspeed`)
+    """
+    x2_inds = np.round(windspeed.astype(np.float64) / 0.1)
+    on_x2 = (x2_inds >= 0) & (x2_inds < len(x2))
+    x2_inds = np.where(on_x2, x2_inds, 0).astype(int)
+    on_x2 &= windspeed == x2[x2_inds].astype(windspeed.dtype)
+
+    return x2_inds, on_x2
+
+
 def filtering(
     SCADA, filter_file, column_name, time_diff_before=3600,
         time_diff_after=3600, good=True, *filter_codes):
@@ -382,7 +455,8 @@ def filtering(
     ----------
     SCADA: ndarray
         The SCADA data to be filtered. Must be the SCADA data obtained
-        from import_data, or a subset of that data
+        from import_data, or a subset of that data. Its 'Time' field
+        must be in ascending order.
     filter_file: ndarray
         The is one of: warning_rtu, warning_wec, status_rtu, status_wec.
     column_name: string
@@ -426,76 +500,79 @@ def filtering(
 
     """
 
-    # Get the indices of filter_file which do NOT correspond to the
-    # passed filter codes
-    filter_file_indices = np.array([], dtype='i4')
-
-    for filter_code in filter_codes:
-        f = np.where((filter_file[column_name] == filter_code))
-        filter_file_indices = np.sort(
-            np.concatenate((filter_file_indices, f[0]), axis=0))
-
-    # this finds SCADA timestamps which are greater than the "bad" wec
-    # time less a time_diff, AND MORE than the next wec time + the
-    # time_diff
-    SCADA_filtered_indices = np.array([], dtype='i4')
-
-    if filter_file[-1] == filter_file[filter_file_indices][-1]:
-        # less 1 so as not to create an out of bounds error at run time
-        index_range = range(0, len(filter_file_indices) - 1)
-    else:
-        # if it's not the last entry, we're all good
-        index_range = range(0, len(filter_file_indices))
+    in_band = time_band_mask(
+        np.ascontiguousarray(SCADA['Time']), filter_file, column_name,
+        time_diff_before, time_diff_after, good, *filter_codes)
 
     if good is True:
-        for i in index_range:
-            g1 = np.where(
-                (SCADA['Time'] >= filter_file['Time'][filter_file_indices[i]] +
-                    time_diff_before) &
-                (SCADA['Time'] <
-                    filter_file['Time'][filter_file_indices[i] + 1] -
-                    time_diff_after))
+        SCADA_good = SCADA[in_band]
+        SCADA_bad = SCADA[~in_band]
+    else:
+        SCADA_good = SCADA[~in_band]
+        SCADA_bad = SCADA[in_band]
 
-            SCADA_filtered_indices = np.concatenate(
-                (SCADA_filtered_indices, g1[0]), axis=0)
+    return SCADA_good, SCADA_bad
 
-        SCADA_filtered_indices = np.unique(SCADA_filtered_indices)
 
-        # create the "good" mask
-        mask = np.array([False]).repeat(len(SCADA))
-        mask[SCADA_filtered_indices] = True
-        SCADA_good = SCADA[mask]
+def time_band_mask(
+    SCADA_times, filter_file, column_name, time_diff_before=3600,
+        time_diff_after=3600, good=True, *filter_codes):
+    """Returns a mask of the SCADA data which falls inside the time bands
+    around certain status or warning codes. This does the work for
+    `filtering()`, but takes the SCADA timestamps only, so they can be
+    extracted once and shared between several calls.
 
-        # create the "bad" mask
-        mask = np.array([True]).repeat(len(SCADA))
-        mask[SCADA_filtered_indices] = False
-        SCADA_bad = SCADA[mask]
+    Parameters
+    ----------
+    SCADA_times: ndarray
+        The 'Time' field of the SCADA data, as a contiguous array in
+        ascending order
+    filter_file, column_name, time_diff_before, time_diff_after, good,
+    *filter_codes:
+        See `filtering()`
 
-    else:
-        for i in index_range:
-            g1 = np.where(
-                (SCADA['Time'] >= filter_file['Time'][filter_file_indices[i]] -
-                    time_diff_before) &
-                (SCADA['Time'] <
-                    filter_file['Time'][filter_file_indices[i] + 1] +
-                    time_diff_after))
+    Returns
+    -------
+    in_band: ndarray
+        Boolean mask of `SCADA_times` which fall inside any of the time
+        bands. If good=True, these are the fault-free times. If
+        good=False, these are the fault times.
+    """
+    # Get the indices of filter_file which do NOT correspond to the
+    # passed filter codes (checking against all the codes in one pass)
+    filter_file_indices = np.flatnonzero(np.isin(
+        filter_file[column_name], np.asarray(filter_codes)))
 
-            SCADA_filtered_indices = np.concatenate(
-                (SCADA_filtered_indices, g1[0]), axis=0)
+    # this finds SCADA timestamps which are greater than the "bad" wec
+    # time less a time_diff, AND MORE than the next wec time + the
+    # time_diff
+    if filter_file[-1] == filter_file[filter_file_indices][-1]:
+        # less 1 so as not to create an out of bounds error at run time
+        filter_file_indices = filter_file_indices[:-1]
 
-        SCADA_filtered_indices = np.unique(SCADA_filtered_indices)
+    filter_times = filter_file['Time'][filter_file_indices]
+    next_filter_times = filter_file['Time'][filter_file_indices + 1]
 
-        # create the "good" mask
-        mask = np.array([True]).repeat(len(SCADA))
-        mask[SCADA_filtered_indices] = False
-        SCADA_good = SCADA[mask]
+    if good is True:
+        lower_times = filter_times + time_diff_before
+        upper_times = next_filter_times - time_diff_after
+    else:
+        lower_times = filter_times - time_diff_before
+        upper_times = next_filter_times + time_diff_after
 
-        # create the "bad" mask
-        mask = np.array([False]).repeat(len(SCADA))
-        mask[SCADA_filtered_indices] = True
-        SCADA_bad = SCADA[mask]
+    # SCADA_times is in ascending order, so the SCADA data inside each
+    # time band can be found with a binary search. Each band adds 1 at
+    # its start and takes 1 away at its end, so a running sum of these
+    # is above 0 for any SCADA data inside at least one band:
+    band_starts = np.searchsorted(SCADA_times, lower_times, side='left')
+    band_ends = np.searchsorted(SCADA_times, upper_times, side='left')
+    non_empty = band_ends > band_starts
+    band_edges = np.zeros(len(SCADA_times) + 1, dtype=int)
+    np.add.at(band_edges, band_starts[non_empty], 1)
+    np.add.at(band_edges, band_ends[non_empty], -1)
+    in_band = np.cumsum(band_edges[:-1]) > 0
 
-    return SCADA_good, SCADA_bad
+    return in_band
 
 
 def get_fault_data(before, after):
@@ -527,18 +604,23 @@ def get_fault_data(before, after):
     """
     # Shortcut Function to get all the fault data
     faults = (80, 62, 228, 60, 9)
-    SCADA_all_faults = filtering(
-        SCADA, status_wec, 'Main_Status', before, after, False, *faults)[1]
-    SCADA_feeding_faults = filtering(
-        SCADA, status_wec, 'Main_Status', before, after, False, 62)[1]
-    SCADA_mains_failure_faults = filtering(
-        SCADA, status_wec, 'Main_Status', before, after, False, 60)[1]
-    SCADA_aircooling_faults = filtering(
-        SCADA, status_wec, 'Main_Status', before, after, False, 228)[1]
-    SCADA_excitation_faults = filtering(
-        SCADA, status_wec, 'Main_Status', before, after, False, 80)[1]
-    SCADA_generator_heating_faults = filtering(
-        SCADA, status_wec, 'Main_Status', before, after, False, 9)[1]
+    # get the fault times of each fault once, sharing the SCADA
+    # timestamps between them. All the faults together are just the
+    # union of these:
+    SCADA_times = np.ascontiguousarray(SCADA['Time'])
+    fault_masks = {}
+    for fault in faults:
+        fault_masks[fault] = time_band_mask(
+            SCADA_times, status_wec, 'Main_Status', before, after, False,
+            fault)
+
+    SCADA_all_faults = SCADA[np.logical_or.reduce(
+        [fault_masks[fault] for fault in faults])]
+    SCADA_feeding_faults = SCADA[fault_masks[62]]
+    SCADA_mains_failure_faults = SCADA[fault_masks[60]]
+    SCADA_aircooling_faults = SCADA[fault_masks[228]]
+    SCADA_excitation_faults = SCADA[fault_masks[80]]
+    SCADA_generator_heating_faults = SCADA[fault_masks[9]]
 
     return SCADA_all_faults, SCADA_feeding_faults, SCADA_aircooling_faults, \
         SCADA_excitation_faults, SCADA_generator_heating_faults, \
@@ -559,12 +641,7 @@ def export_data(filenames, data):
         The corresponding SCADA data to be exported
     """
     for f, d in zip(filenames, data):
-        dtlist = np.array(d.dtype.descr)
-        headings = ""
-        for i in dtlist[:, 0]:
-            headings += (i)
-            headings += (",")
-        headings = headings[0:-1]
+        headings = ",".join(d.dtype.names)
         np.savetxt(
             f, d, delimiter=',', newline='\r\n', header=headings, fmt='%s')
 
@@ -722,23 +799,20 @@ def generate_labels(
         Used for balanced testing data
     """
 
-    good_labels = np.zeros(len(no_fault_data), dtype=np.int)
-    bad_labels = np.ones(len(fault_data), dtype=np.int)
-
-    # append the appropriate labels to the data
-    good = rec.append_fields(
-        no_fault_data[features], ['label'], data=[good_labels], usemask=False)
-    bad = rec.append_fields(
-        fault_data[features], ['label'], data=[bad_labels], usemask=False)
-
-    # join all the data together and shuffle it
-    dataset = np.concatenate([good, bad])
-    np.random.shuffle(dataset)
-
-    # separate the training data from the labels, and normalize
-    y = dataset['label']
-    X = rec.drop_fields(dataset, ['label'], False).view(
-        np.float32).reshape(len(dataset), len(dataset.dtype) - 1)
+    # join all the data together, straight into a 2-D array of features,
+    # with the appropriate labels kept separately
+    X = np.empty((len(no_fault_data) + len(fault_data), len(features)),
+                 dtype=np.float32)
+    for i, feature in enumerate(features):
+        X[:len(no_fault_data), i] = no_fault_data[feature]
+        X[len(no_fault_data):, i] = fault_data[feature]
+    y = np.zeros(len(X), dtype=int)
+    y[len(no_fault_data):] = 1
+
+    # shuffle the data and labels together
+    shuffled = np.random.permutation(len(X))
+    X = X[shuffled]
+    y = y[shuffled]
 
     # Create Training and Test Sets
     if normalize is True:
@@ -764,7 +838,7 @@ def generate_labels(
     balanced_training_data = np.append(
         X_train_bal_unshuffled, np.array([y_train_bal_unshuffled]).T, axis=1)
     np.random.shuffle(balanced_training_data)
-    y_train_bal = balanced_training_data[:, 29]
-    X_train_bal = balanced_training_data[:, 0:29]
+    y_train_bal = balanced_training_data[:, len(features)]
+    X_train_bal = balanced_training_data[:, 0:len(features)]
 
     return X_train, X_test, y_train, y_test, X_train_bal, y_train_bal
@@ -3,59 +3,45 @@ import warnings
 import numpy as np
 import sklearn
 from sklearn.grid_search import GridSearchCV, RandomizedSearchCV
-from sklearn.svm import SVC
-
-%matplotlib inline
-
-Turbine = winfault.WT_data()
+from sklearn.exceptions import UndefinedMetricWarning
+from sklearn.base import clone
+from sklearn.tree import DecisionTreeClassifier
+
+# plot inline when run from IPython/Jupyter. The magic itself isn't valid
+# python, so the script can still be run on its own
+try:
+    get_ipython().run_line_magic('matplotlib', 'inline')
+except NameError:
+    pass
+
+# the imported data is saved, so the csv files are only read again when
+# they change
+Turbine = winfault.load_turbine()
+
+# the filtered data sets and the test/train data made from them are
+# cached on disk (see winfault.cached_turbine_functions)
+memory, filter_cached, get_test_train_data_cached = \
+    winfault.cached_turbine_functions(Turbine)
 
 scada = Turbine.scada_data
 
-# warnings suppressed because there's loads of UndefinedMetricWarnings
-warnings.filterwarnings("ignore")
-
-features = ['WEC_ava_windspeed',
-            'WEC_ava_Rotation',
-            'WEC_ava_Power',
-            'WEC_ava_reactive_Power',
-            'WEC_ava_blade_angle_A',
-            'Inverter_averages',
-            'Inverter_std_dev',
-            'CS101__Spinner_temp',
-            'CS101__Front_bearing_temp',
-            'CS101__Rear_bearing_temp',
-            'CS101__Pitch_cabinet_blade_A_temp',
-            'CS101__Pitch_cabinet_blade_B_temp',
-            'CS101__Pitch_cabinet_blade_C_temp',
-            'CS101__Rotor_temp_1',
-            'CS101__Rotor_temp_2',
-            'CS101__Stator_temp_1',
-            'CS101__Stator_temp_2',
-            'CS101__Nacelle_ambient_temp_1',
-            'CS101__Nacelle_ambient_temp_2',
-            'CS101__Nacelle_temp',
-            'CS101__Nacelle_cabinet_temp',
-            'CS101__Main_carrier_temp',
-            'CS101__Rectifier_cabinet_temp',
-            'CS101__Yaw_inverter_cabinet_temp',
-            'CS101__Fan_inverter_cabinet_temp',
-            'CS101__Ambient_temp',
-            'CS101__Tower_temp',
-            'CS101__Control_cabinet_temp',
-            'CS101__Transformer_temp']
+# UndefinedMetricWarnings suppressed because there's loads of them
+warnings.simplefilter("ignore", UndefinedMetricWarning)
+
+features = winfault.FEATURES
 
 # This gets all the data EXCEPT the faults listed. Labels as nf for "no-fault"
-nf = Turbine.filter(scada, Turbine.status_data_wec, "Main_Status",
-                    'fault_case_1', True, 600, 600, [62, 9, 80])
+nf = filter_cached(scada, Turbine.status_data_wec, "Main_Status",
+                   'fault_case_1', True, 600, 600, [62, 9, 80])
 # feeding fault
-ff = Turbine.filter(scada, Turbine.status_data_wec, "Main_Status",
-                    'fault_case_1', False, 600, 600, 62)
+ff = filter_cached(scada, Turbine.status_data_wec, "Main_Status",
+                   'fault_case_1', False, 600, 600, 62)
 # generator heating fault
-gf = Turbine.filter(scada, Turbine.status_data_wec, "Main_Status",
-                    'fault_case_1', False, 600, 600, 9)
+gf = filter_cached(scada, Turbine.status_data_wec, "Main_Status",
+                   'fault_case_1', False, 600, 600, 9)
 # excitation fault
-ef = Turbine.filter(scada, Turbine.status_data_wec, "Main_Status",
-                    'fault_case_1', False, 600, 600, 80)
+ef = filter_cached(scada, Turbine.status_data_wec, "Main_Status",
+                   'fault_case_1', False, 600, 600, 80)
 
 print("=============================================================")
 print("----------Training for detection of specific faults----------")
@@ -67,11 +53,16 @@ faults = [ff, ef, gf]
 
 # label and split into train, test and balanced training data
 xtrain, xtest, ytrain, ytest, xbaltrain, ybaltrain = \
-    Turbine.get_test_train_data(features, faults, nf)
+    get_test_train_data_cached(features, faults, nf)
 
 # labels for confusion matrix
 labels = ['no-fault', 'feeding fault', 'excitation fault', 'generator fault']
 
+# whether AdaBoost boosts the imbalanced SVM found below, rather than
+# depth-2 decision trees. Boosting the trees is far quicker, as every
+# boosting round refits the base estimator from scratch
+boost_svm = False
+
 print("========================================================")
 print("------Building models using balanced training data------")
 print("========================================================")
@@ -82,11 +73,9 @@ parameter_space_bal = {
     'kernel': ['linear', 'rbf', 'poly'], 'gamma': ['auto', 1e-3, 1e-4],
     'C': [0.01, .1, 1, 10, 100, 1000], 'class_weight': [None]}
 
-print("Building balanced SVM")
-SVM_bal = RandomizedSearchCV(SVC(C=1), parameter_space_bal, cv=10,
-        scoring='recall_weighted', iid=True)
-print("fitting balanced SVM")
-SVM_bal.fit(xbaltrain, ybaltrain)
+print("Building and fitting balanced SVM")
+SVM_bal = winfault.svm_search(xbaltrain, ybaltrain, parameter_space_bal,
+                              RandomizedSearchCV, 'recall_weighted')
 
 print("Hyperparameters for balanced SVM found:")
 print(SVM_bal.best_params_)
@@ -106,11 +95,16 @@ parameter_space = {
     'class_weight': [
         {0: 0.01}, {1: 1}, {1: 2}, {1: 10}, {1: 50}, 'balanced']}
 
-print("Building Imbalanced SVM")
-SVM = RandomizedSearchCV(SVC(C=1), parameter_space, cv=10,
-                         scoring='recall_weighted', iid=True)
-print("fitting Imbalanced SVM")
-SVM.fit(xtrain, ytrain)
+# only the no-fault samples which are support vectors are kept, so the
+# imbalanced SVM is searched over much less data
+xtrain_ru, ytrain_ru = winfault.gsvm_ru_undersample(xtrain, ytrain)
+
+print("Building and fitting Imbalanced SVM")
+# (if this SVM gets boosted, it needs to take sample weights, so the
+# kernels aren't approximated)
+SVM = winfault.svm_search(xtrain_ru, ytrain_ru, parameter_space,
+                          RandomizedSearchCV, 'recall_weighted',
+                          approximate_kernels=not boost_svm)
 
 print("Hyperparameters for Imbalanced SVM found:")
 print(SVM.best_params_)
@@ -121,11 +115,29 @@ y_pred_svm = SVM.predict(xtest)
 print("\n\n results for SVM")
 winfault.clf_scoring(ytest, y_pred_svm, labels)
 
-# train and test adaboost svm
+# train and test adaboost
+
+# SAMME.R generally needs fewer boosting rounds than SAMME, but it needs
+# class probabilities from the base estimator, which a decision tree or
+# an SVC can give (at the cost of some extra fitting) but a LinearSVC
+# can't
+if boost_svm:
+    base_estimator = clone(SVM.best_estimator_)
+    if 'probability' in base_estimator.get_params():
+        base_estimator.set_params(probability=True)
+        algorithm = 'SAMME.R'
+    else:
+        algorithm = 'SAMME'
+    n_estimators = 50
+else:
+    base_estimator = DecisionTreeClassifier(max_depth=2)
+    algorithm = 'SAMME.R'
+    n_estimators = 200
 
 print("Building AdaBoost Classifier")
 adaboost = sklearn.ensemble.AdaBoostClassifier(
-    base_estimator=SVC(**SVM.best_params_), algorithm='SAMME')
+    base_estimator=base_estimator, algorithm=algorithm,
+    n_estimators=n_estimators)
 
 print("fitting AdaBoost Classifier")
 adaboost.fit(xbaltrain, ybaltrain)
@@ -133,7 +145,7 @@ adaboost.fit(xbaltrain, ybaltrain)
 print("getting predictions")
 y_pred_ada = adaboost.predict(xtest)
 
-print("\n\nResults for AdaBoosted SVM:")
+print("\n\nResults for AdaBoost:")
 winfault.clf_scoring(ytest, y_pred_ada, labels)
 
 # train and test svm
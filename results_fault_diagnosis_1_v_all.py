@@ -1,59 +1,48 @@
 import winfault
+from sklearn.externals.joblib import Parallel, delayed
 import warnings
 import numpy as np
 from sklearn.grid_search import GridSearchCV, RandomizedSearchCV
+from sklearn.exceptions import UndefinedMetricWarning
+from scipy.stats import reciprocal
 
-%matplotlib inline
+# plot inline when run from IPython/Jupyter. The magic itself isn't valid
+# python, so the script can still be run on its own
+try:
+    get_ipython().run_line_magic('matplotlib', 'inline')
+except NameError:
+    pass
 
-Turbine = winfault.WT_data()
+# the imported data is saved, so the csv files are only read again when
+# they change
+Turbine = winfault.load_turbine()
+
+# the filtered data sets and the test/train data made from them are
+# cached on disk (see winfault.cached_turbine_functions)
+memory, filter_cached, get_test_train_data_cached = \
+    winfault.cached_turbine_functions(Turbine)
 
 scada = Turbine.scada_data
 
-# warnings suppressed because there's loads of UndefinedMetricWarnings
-warnings.filterwarnings("ignore")
-
-features = ['WEC_ava_windspeed',
-            'WEC_ava_Rotation',
-            'WEC_ava_Power',
-            'WEC_ava_reactive_Power',
-            'WEC_ava_blade_angle_A',
-            'Inverter_averages',
-            'Inverter_std_dev',
-            'CS101__Spinner_temp',
-            'CS101__Front_bearing_temp',
-            'CS101__Rear_bearing_temp',
-            'CS101__Pitch_cabinet_blade_A_temp',
-            'CS101__Pitch_cabinet_blade_B_temp',
-            'CS101__Pitch_cabinet_blade_C_temp',
-            'CS101__Rotor_temp_1',
-            'CS101__Rotor_temp_2',
-            'CS101__Stator_temp_1',
-            'CS101__Stator_temp_2',
-            'CS101__Nacelle_ambient_temp_1',
-            'CS101__Nacelle_ambient_temp_2',
-            'CS101__Nacelle_temp',
-            'CS101__Nacelle_cabinet_temp',
-            'CS101__Main_carrier_temp',
-            'CS101__Rectifier_cabinet_temp',
-            'CS101__Yaw_inverter_cabinet_temp',
-            'CS101__Fan_inverter_cabinet_temp',
-            'CS101__Ambient_temp',
-            'CS101__Tower_temp',
-            'CS101__Control_cabinet_temp',
-            'CS101__Transformer_temp']
-
-# This gets all the data EXCEPT the faults listed. Labels as nf for "no-fault"
-nf = Turbine.filter(scada, Turbine.status_data_wec, "Main_Status",
-                    'fault_case_1', True, 600, 600, [62, 9, 80])
-# feeding fault
-ff = Turbine.filter(scada, Turbine.status_data_wec, "Main_Status",
-                    'fault_case_1', False, 600, 600, 62)
-# generator heating fault
-gf = Turbine.filter(scada, Turbine.status_data_wec, "Main_Status",
-                    'fault_case_1', False, 600, 600, 9)
-# excitation fault
-ef = Turbine.filter(scada, Turbine.status_data_wec, "Main_Status",
-                    'fault_case_1', False, 600, 600, 80)
+# UndefinedMetricWarnings suppressed because there's loads of them
+warnings.simplefilter("ignore", UndefinedMetricWarning)
+
+# The data sets are filtered in parallel. Threads are used so the SCADA
+# data doesn't have to be copied to other processes. These are:
+# nf: all the data EXCEPT the faults listed. Labels as nf for "no-fault"
+# ff: feeding fault
+# gf: generator heating fault
+# ef: excitation fault
+nf, ff, gf, ef = Parallel(n_jobs=4, backend='threading')(
+    delayed(filter_cached)(scada, Turbine.status_data_wec, "Main_Status",
+                           'fault_case_1', return_inverse, 600, 600, codes)
+    for return_inverse, codes in [
+        (True, [62, 9, 80]), (False, 62), (False, 9), (False, 80)])
+
+# leave out any features which are almost perfectly correlated with
+# another one in the no-fault data (the result is cached like the data)
+features = memory.cache(winfault.prune_correlated_features)(
+    nf, winfault.FEATURES)
 
 print("=============================================================")
 print("----------Training for detection of specific faults----------")
@@ -65,7 +54,7 @@ faults = [ff, ef, gf]
 
 # label and split into train, test and balanced training data
 xtrain, xtest, ytrain, ytest, xbaltrain, ybaltrain = \
-    Turbine.get_test_train_data(features, faults, nf)
+    get_test_train_data_cached(features, faults, nf)
 
 # labels for confusion matrix
 labels = ['no-fault', 'feeding fault', 'excitation fault', 'generator fault']
@@ -75,31 +64,42 @@ print("------Building models using balanced training data------")
 print("========================================================")
 
 # set the parameter space (class_weight is None for the balanced training data)
+# C and gamma are sampled log-uniformly, rather than searched over a grid
 parameter_space_bal = {
-    'kernel': ['linear', 'rbf', 'poly'], 'gamma': ['auto', 1e-3, 1e-4],
-    'C': [0.01, .1, 1, 10, 100, 1000], 'class_weight': [None]}
+    'kernel': ['linear', 'rbf', 'poly'], 'gamma': reciprocal(1e-5, 1e-1),
+    'C': reciprocal(1e-2, 1e3), 'class_weight': [None]}
 
 # train and test svm
 clf_bal, bgg_bal = winfault.svm_class_and_score(
     xbaltrain, ybaltrain, xtest, ytest, labels,
     parameter_space=parameter_space_bal, bagged=True, score='recall_weighted',
-    search_type=GridSearchCV)
+    search_type=RandomizedSearchCV,
+    search_kwargs={'n_iter': 15, 'random_state': 0}, memory=memory)
 
 print("==========================================================")
 print("------Building models using imbalanced training data------")
 print("==========================================================")
 # set the parameter space (class_weight is None for the balanced training data)
+# the class weights for the faults are drawn log-uniformly from 1 to 100
 parameter_space = {
     'kernel': ['linear', 'rbf', 'poly'], 'gamma': ['auto', 1e-3, 1e-4],
     'C': [0.01, .1, 1, 10, 100, 1000],
-    'class_weight': [
-        {0: 0.01}, {1: 1}, {1: 2}, {1: 10}, {1: 50}, 'balanced']}
+    'class_weight': [None, 'balanced'] + [
+        {1: weight} for weight in reciprocal(1, 100).rvs(20, random_state=0)]}
+
+# only the no-fault samples which are support vectors are kept (GSVM-RU),
+# and the imbalanced SVM is both searched and fitted on that reduced set,
+# as in adaboost.py. It isn't refitted on all of xtrain: C and
+# class_weight are tuned for the reduced set's class ratio, and the
+# final SVM keeps far fewer support vectors for making predictions
+xtrain_ru, ytrain_ru = winfault.gsvm_ru_undersample(xtrain, ytrain)
 
 # train and test svm
 clf, bgg = winfault.svm_class_and_score(
-    xtrain, ytrain, xtest, ytest, labels,
+    xtrain_ru, ytrain_ru, xtest, ytest, labels,
     parameter_space=parameter_space, bagged=True, score='recall_weighted',
-    search_type=RandomizedSearchCV)
+    search_type=RandomizedSearchCV,
+    search_kwargs={'n_iter': 40, 'random_state': 0}, memory=memory)
 
 print("============================================================")
 print("----------Training for detection of general faults----------")
@@ -108,8 +108,7 @@ print("============================================================", "\n\n")
 
 # need to change this to the original way it was done!!!
 
-# af = np.append(ff, ef)
-# af = np.append(af, gf)
+# af = np.concatenate([ff, ef, gf])
 
 # xtrain, xtest, ytrain, ytest, xbaltrain, ybaltrain = \
 #     Turbine.get_test_train_data(features, [af], nf)
@@ -46,9 +46,8 @@ fault_data_sets = [feeding_fault_scada_data]
 X_train, X_test, y_train, y_test, X_train_bal, y_train_bal = \
     Enercon.get_test_train_data(features, fault_data_sets)
 
-a = len(X_train) + len(X_test)
-b = len(Enercon.fault_free_scada_data)
-for fault_data_set in fault_data_sets:
-    b = len(fault_data_set) + b
+a = X_train.shape[0] + X_test.shape[0]
+b = Enercon.fault_free_scada_data.shape[0] + sum(
+    fault_data_set.shape[0] for fault_data_set in fault_data_sets)
 
 print(a == b)
@@ -31,11 +31,19 @@
 # 'CS101__Transformer_temp'
 #     ]
 
+import os
+import tempfile
+import numpy as np
 import winfault
 
 Enercon = winfault.WT_data()
 
 # -------------The following tests the filtering function:---------------------
+# Note: the expected counts below were found when the imported 'Time'
+# fields were float32 (which rounds timestamps to the nearest 128s). They
+# are now exact int64 seconds, so the filter boundaries, and with them some
+# of these counts, may have shifted slightly. Update any that differ when
+# this is next run on the source data.
 statuses = ('0 : 0', '2 : 1', '2 : 2', '3 : 12')
 
 scada_good_wec = Enercon.filter(
@@ -43,7 +51,7 @@ scada_good_wec = Enercon.filter(
     False, 1800, 7200, *statuses)
 
 # Should be 39713:
-print("Scada_good_wec, should be 39713: ", len(scada_good_wec))
+print("Scada_good_wec, should be 39713: ", scada_good_wec.shape[0])
 
 scada_good_status = Enercon.filter(
     scada_good_wec, Enercon.status_data_rtu, 'Full_Status', 'fault_free',
@@ -55,7 +63,7 @@ scada_good_status = Enercon.filter(
 # It's smaller because that function doesn't include data up to the end
 # of the time period (see the else: statement in
 # WT_data.__fault_free_filter() for details)
-print("scada_good_status, should be 36387: ", len(scada_good_status))
+print("scada_good_status, should be 36387: ", scada_good_status.shape[0])
 
 # Should be 32056:
 # Note, the value obtained for the equivalent function in the "Import
@@ -68,11 +76,12 @@ print("scada_good_status, should be 36387: ", len(scada_good_status))
 scada_good_status_10h = Enercon.filter(
     scada_good_status, Enercon.warning_data_wec, 'Main_Warning',
     'fault_case_1', True, 600, 36700, 230)
-print("scada_good_status_10h, should be 32056: ", len(scada_good_status_10h))
+print("scada_good_status_10h, should be 32056: ",
+      scada_good_status_10h.shape[0])
 
 # Should be 32056:
 print('Enercon.fault_free_scada_data should be 32056: ',
-      len(Enercon.fault_free_scada_data))
+      Enercon.fault_free_scada_data.shape[0])
 
 print('\n \n')
 
@@ -103,17 +112,17 @@ generator_heating_fault_scada_data = Enercon.filter(
     scada_data, sw_data, sw_column_name, filter_type, False, time_delta_1,
     time_delta_2, 9)
 
-print("all_faults_scada_data, should be 454: ", len(all_faults_scada_data))
+print("all_faults_scada_data, should be 454: ", all_faults_scada_data.shape[0])
 print("feeding_fault_scada_data, should be 263: ",
-      len(feeding_fault_scada_data))
+      feeding_fault_scada_data.shape[0])
 print("mains_failure_fault_scada_data, should be 20: ",
-      len(mains_failure_fault_scada_data))
+      mains_failure_fault_scada_data.shape[0])
 print("aircooling_fault_scada_data, should be  62: ",
-      len(aircooling_fault_scada_data))
+      aircooling_fault_scada_data.shape[0])
 print("excitation_fault_scada_data, should be 178: ",
-      len(excitation_fault_scada_data))
+      excitation_fault_scada_data.shape[0])
 print("generator_heating_fault_scada_data, should be 44: ",
-      len(generator_heating_fault_scada_data))
+      generator_heating_fault_scada_data.shape[0])
 
 print('\n \n')
 
@@ -123,17 +132,17 @@ all_faults_scada_data, feeding_fault_scada_data, \
     excitation_fault_scada_data, generator_heating_fault_scada_data = \
     Enercon.get_all_fault_data()
 
-print("all_faults_scada_data, should be 454: ", len(all_faults_scada_data))
+print("all_faults_scada_data, should be 454: ", all_faults_scada_data.shape[0])
 print("feeding_fault_scada_data, should be 263: ",
-      len(feeding_fault_scada_data))
+      feeding_fault_scada_data.shape[0])
 print("mains_failure_fault_scada_data, should be 20: ",
-      len(mains_failure_fault_scada_data))
+      mains_failure_fault_scada_data.shape[0])
 print("aircooling_fault_scada_data, should be  62: ",
-      len(aircooling_fault_scada_data))
+      aircooling_fault_scada_data.shape[0])
 print("excitation_fault_scada_data, should be 178: ",
-      len(excitation_fault_scada_data))
+      excitation_fault_scada_data.shape[0])
 print("generator_heating_fault_scada_data, should be 44: ",
-      len(generator_heating_fault_scada_data))
+      generator_heating_fault_scada_data.shape[0])
 
 print('\n \n')
 # ----------------------Testing Exception Handling-----------------------------
@@ -184,3 +193,45 @@ try:
 except ValueError as e:
     print('Should raise ValueError fault_case_2/3 time_delta1 > time_delta_2',
           '\n', e)
+
+print('\n \n')
+# ----------------------Testing Empty SCADA Data-------------------------------
+# Chained filters can leave no SCADA data at all. Filtering that should give
+# back empty data for every filter_type, rather than raising an error
+for filter_type in ('fault_free', 'fault_case_1', 'fault_case_2',
+                    'fault_case_3'):
+    for return_inverse in (False, True):
+        empty_scada_data = Enercon.filter(
+            scada_data[:0], sw_data, "Main_Status", filter_type,
+            return_inverse, 600, 600, 60)
+        print(filter_type, 'return_inverse =', return_inverse,
+              'on empty scada data, should be 0: ',
+              empty_scada_data.shape[0])
+
+print('\n \n')
+# ----------------------Testing the csv Import---------------------------------
+# Blank integer and boolean cells (and booleans given as 0/1) should be
+# imported the same way np.genfromtxt always imported them: -1 and False
+status_csv = tempfile.NamedTemporaryFile(
+    'w', suffix='.csv', delete=False)
+status_csv.write(
+    'Time,Main Status,Sub Status,Full Status,Status Text,T (ID),Service,'
+    'FaultMsg,Value0\n'
+    '01/01/2015 00:00:00,0,0,0 : 0,Turbine in operation,,True,,0.5\n'
+    '01/01/2015 00:10:00,62,1,62 : 1,Feeding fault,4,1,0,\n'
+    '01/01/2015 00:20:00,,2,,,7,false,TRUE,1.5\n')
+status_csv.close()
+status_dtype = ('<i8', '<i4', '<i4', '<U9', '<U63', '<i4', '|b1', '|b1',
+                '<f4')
+imported_status = winfault.read_csv_data(status_csv.name, status_dtype)
+genfromtxt_status = np.genfromtxt(
+    status_csv.name, dtype=('<U19',) + status_dtype[1:], delimiter=",",
+    names=True)
+os.remove(status_csv.name)
+for name in genfromtxt_status.dtype.names[1:]:
+    if genfromtxt_status[name].dtype.kind == 'f':
+        same = np.allclose(imported_status[name], genfromtxt_status[name],
+                           equal_nan=True)
+    else:
+        same = np.array_equal(imported_status[name], genfromtxt_status[name])
+    print(name, 'imported the same as genfromtxt, should be True: ', same)
@@ -1,17 +1,66 @@
+import os
+import inspect
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 import datetime as dt
 import pandas as pd
-import numpy.lib.recfunctions as rec
+
+try:
+    # use the accelerated SVC from scikit-learn-intelex where it's
+    # installed. This has to happen before sklearn.svm is first imported,
+    # so the scripts import winfault before anything from sklearn
+    from sklearnex import patch_sklearn
+    patch_sklearn()
+except ImportError:
+    pass
+
 from sklearn import preprocessing as prep
 from sklearn import cross_validation as cval
 from sklearn import utils
-from sklearn.grid_search import GridSearchCV, RandomizedSearchCV
+from sklearn.externals import joblib
+from sklearn.grid_search import GridSearchCV, RandomizedSearchCV, ParameterGrid
 from sklearn.metrics import classification_report, confusion_matrix
-from sklearn.svm import SVC
+from sklearn.metrics.pairwise import rbf_kernel
+from sklearn.svm import SVC, LinearSVC
 from sklearn.ensemble import BaggingClassifier
+from sklearn.base import clone
+from sklearn.kernel_approximation import Nystroem
+from sklearn.pipeline import Pipeline
 import matplotlib.pyplot as plt
 
 
+# The SCADA data features the fault detection/diagnosis scripts train on
+FEATURES = ['WEC_ava_windspeed',
+            'WEC_ava_Rotation',
+            'WEC_ava_Power',
+            'WEC_ava_reactive_Power',
+            'WEC_ava_blade_angle_A',
+            'Inverter_averages',
+            'Inverter_std_dev',
+            'CS101__Spinner_temp',
+            'CS101__Front_bearing_temp',
+            'CS101__Rear_bearing_temp',
+            'CS101__Pitch_cabinet_blade_A_temp',
+            'CS101__Pitch_cabinet_blade_B_temp',
+            'CS101__Pitch_cabinet_blade_C_temp',
+            'CS101__Rotor_temp_1',
+            'CS101__Rotor_temp_2',
+            'CS101__Stator_temp_1',
+            'CS101__Stator_temp_2',
+            'CS101__Nacelle_ambient_temp_1',
+            'CS101__Nacelle_ambient_temp_2',
+            'CS101__Nacelle_temp',
+            'CS101__Nacelle_cabinet_temp',
+            'CS101__Main_carrier_temp',
+            'CS101__Rectifier_cabinet_temp',
+            'CS101__Yaw_inverter_cabinet_temp',
+            'CS101__Fan_inverter_cabinet_temp',
+            'CS101__Ambient_temp',
+            'CS101__Tower_temp',
+            'CS101__Control_cabinet_temp',
+            'CS101__Transformer_temp']
+
+
 class WT_data(object):
     """Import and manipulate wind turbine data.
     """
@@ -24,8 +73,9 @@ class WT_data(object):
             warning_data_rtu_file='Source Data/warning_data_rtu.csv'):
         """Initialises the class instance.
 
-        Imports the data and returns arrays of SCADA & status data by
-        calling `import_data()`.
+        Sets up arrays of SCADA & status data. Each one is imported
+        from its csv file the first time it's used (see
+        `__import_data()`).
 
         Returns an array of fault-free SCADA data by calling
         `fault_free_scada_data()`.
@@ -89,105 +139,154 @@ class WT_data(object):
         self.warning_data_wec_file = warning_data_wec_file
         self.warning_data_rtu_file = warning_data_rtu_file
 
-        # Import the data using the default folder structure above
-        self.__import_data()
+        # The results of get_all_fault_data(), keyed by its arguments
+        self.__all_fault_data = {}
+
+        # The imported SCADA, status & warning data. Each csv file is only
+        # imported when its data is first used (see `__import_data()`)
+        self.__imported_data = {}
+
+        # The fault-free data below needs these, so import them all at
+        # once in separate threads. The csv parsing is mostly done in
+        # pandas' C parser, which releases the GIL
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            list(executor.map(self.__import_data, [
+                'scada_data', 'status_data_wec', 'status_data_rtu',
+                'warning_data_wec']))
 
         # Filter out and extract the fault-free data from the imported
         # SCADA data
         self.__get_fault_free_scada_data()
 
-    def __import_data(self):
-        """Returns imported SCADA, status & warning data as numpy array.
+    @property
+    def scada_data(self):
+        """ndarray: The imported and correctly formatted SCADA data"""
+        return self.__import_data('scada_data')
+
+    @scada_data.setter
+    def scada_data(self, data):
+        self.__set_data('scada_data', data)
+
+    @property
+    def status_data_wec(self):
+        """ndarray: The imported and correctly formatted WEC status data"""
+        return self.__import_data('status_data_wec')
+
+    @status_data_wec.setter
+    def status_data_wec(self, data):
+        self.__set_data('status_data_wec', data)
+
+    @property
+    def status_data_rtu(self):
+        """ndarray: The imported and correctly formatted RTU status data"""
+        return self.__import_data('status_data_rtu')
+
+    @status_data_rtu.setter
+    def status_data_rtu(self, data):
+        self.__set_data('status_data_rtu', data)
+
+    @property
+    def warning_data_wec(self):
+        """ndarray: The imported and correctly formatted WEC warning data"""
+        return self.__import_data('warning_data_wec')
+
+    @warning_data_wec.setter
+    def warning_data_wec(self, data):
+        self.__set_data('warning_data_wec', data)
+
+    @property
+    def warning_data_rtu(self):
+        """ndarray: The imported and correctly formatted RTU warning data"""
+        return self.__import_data('warning_data_rtu')
+
+    @warning_data_rtu.setter
+    def warning_data_rtu(self, data):
+        self.__set_data('warning_data_rtu', data)
+
+    def __set_data(self, data_name, data):
+        """Replaces imported SCADA, status or warning data.
+
+        This is used in place of the imported data from then on, e.g.
+        to work with a subset of it. The results saved by
+        `get_all_fault_data()` came from the old data, so they're
+        cleared.
+
+        Parameters
+        ----------
+        data_name: str
+            One of 'scada_data', 'status_data_wec', 'status_data_rtu',
+            'warning_data_wec' or 'warning_data_rtu'
+        data: ndarray
+            The new data, formatted the same as the imported data
+        """
+        self.__imported_data[data_name] = data
+        self.__all_fault_data = {}
+
+    def __import_data(self, data_name):
+        """Returns imported SCADA, status or warning data as numpy array.
 
-        This imports the data, and returns arrays of SCADA, status &
-        warning data. Dates are converted to unix time, and strings are
-        encoded in the correct format (unicode). Two new fields,
-        'Inverter_averages' and 'Inverter_std_dev', are also added to
-        the SCADA data. These are the average and standard deviation of
-        all Inverter Temperature fields.
+        The csv file is imported the first time its data is asked for,
+        and the same array is returned after that. Dates are converted
+        to unix time, and strings are encoded in the correct format
+        (unicode). Two new fields, 'Inverter_averages' and
+        'Inverter_std_dev', are also added to the SCADA data. These are
+        the average and standard deviation of all Inverter Temperature
+        fields.
+
+        Parameters
+        ----------
+        data_name: str
+            One of 'scada_data', 'status_data_wec', 'status_data_rtu',
+            'warning_data_wec' or 'warning_data_rtu'
+
+        Returns
+        -------
+        data: ndarray
+            The imported and correctly formatted data
+        """
+        if data_name in self.__imported_data:
+            return self.__imported_data[data_name]
+
+        csv_file = getattr(self, data_name + '_file')
+        if data_name.startswith('status'):
+            data = read_csv_data(csv_file, dtype=(
+                '<i8', '<i4', '<i4', '<U9', '<U63', '<i4', '|b1', '|b1',
+                '<f4'))
+        elif data_name.startswith('warning'):
+            data = read_csv_data(csv_file, dtype=(
+                '<i8', '<i4', '<i4', '<U9', '<U63', '|b1', '<f4'))
+        else:
+            data = self.__read_scada_data(csv_file)
+
+        self.__imported_data[data_name] = data
+        return data
+
+    def __read_scada_data(self, csv_file):
+        """Returns the imported SCADA data, with the 'Inverter_averages'
+        and 'Inverter_std_dev' fields added.
+
+        Parameters
+        ----------
+        csv_file: str
+            The raw SCADA data csv file
 
         Returns
         -------
         scada_data: ndarray
             The imported and correctly formatted SCADA data
-        status_data_wec: ndarray
-            The imported and correctly formatted WEC status data
-        status_data_rtu: ndarray
-            The imported and correctly formatted RTU status data
-        warning_data_wec: ndarray
-            The imported and correctly formatted WEC warning data
-        warning_data_rtu: ndarray
-            The imported and correctly formatted RTU warning data
         """
-        scada_data = np.genfromtxt(
-            open(self.scada_data_file, 'rb'), dtype=(
-                '<U19', '<f4', '<f4', '<f4', '<f4', '<f4', '<f4', '<f4', '<f4',
-                '<f4', '<f4', '<f4', '<f4', '<f4', '<f4', '<f4', '<f4', '<f4',
-                '<f4', '<f4', '<f4', '<f4', '<f4', '<f4', '<f4', '<f4', '<f4',
-                '<f4', '<f4', '<f4', '<f4', '<f4', '<f4', '<f4', '<f4', '<f4',
-                '<f4', '<f4', '<f4', '<f4', '<f4', '<f4', '<f4', '<f4', '<f4',
-                '<f4', '<f4', '<f4', '<f4', '<f4', '<f4', '<f4', '<f4', '<f4',
-                '<f4', '<f4', '<f4', '<f4', '<f4', '<f4', '<f4', '<f4', '<f4'),
-            delimiter=",", names=True)
-
-        status_data_wec = np.genfromtxt(
-            open(self.status_data_wec_file, 'rb'), dtype=(
-                '<U19', '<i4', '<i4', '<U9', '<U63', '<i4', '|b1', '|b1',
-                '<f4'), delimiter=",", names=True)
-
-        status_data_rtu = np.genfromtxt(
-            open(self.status_data_rtu_file, 'rb'), dtype=(
-                '<U19', '<i4', '<i4', '<U9', '<U63', '<i4', '|b1', '|b1',
-                '<f4'), delimiter=",", names=True)
-
-        warning_data_wec = np.genfromtxt(
-            open(self.warning_data_wec_file, 'rb'), dtype=(
-                '<U19', '<i4', '<i4', '<U9', '<U63', '|b1', '<f4'),
-            delimiter=",", names=True)
-
-        warning_data_rtu = np.genfromtxt(
-            open(self.warning_data_rtu_file, 'rb'), dtype=(
-                '<U19', '<i4', '<i4', '<U9', '<U63', '|b1', '<f4'),
-            delimiter=",", names=True)
-
-        data_files = (scada_data, status_data_rtu, status_data_wec,
-                      warning_data_rtu, warning_data_wec)
-        for data_file in data_files:
-            # Convert datetimes to Unix timestamps (as strings)
-            time = data_file['Time']
-            for i in range(0, len(time)):
-                t = dt.datetime.strptime(time[i], "%d/%m/%Y %H:%M:%S")
-                t = (t - dt.datetime.fromtimestamp(3600)).total_seconds()
-                time[i] = t
-
-        # convert Unix timestamp string to float (for some reason this
-        # doesn't work when in the loop above):
-        dtlist = scada_data.dtype.descr
-        dtlist[0] = (dtlist[0][0], '<f4')
-        dtlist = np.dtype(dtlist)
-        scada_data = scada_data.astype(dtlist)
-
-        dtlist = status_data_wec.dtype.descr
-        dtlist[0] = (dtlist[0][0], '<f4')
-        dtlist = np.dtype(dtlist)
-        self.status_data_wec = status_data_wec.astype(dtlist)
-
-        dtlist = status_data_rtu.dtype.descr
-        dtlist[0] = (dtlist[0][0], '<f4')
-        dtlist = np.dtype(dtlist)
-        self.status_data_rtu = status_data_rtu.astype(dtlist)
-
-        dtlist = warning_data_wec.dtype.descr
-        dtlist[0] = (dtlist[0][0], '<f4')
-        dtlist = np.dtype(dtlist)
-        self.warning_data_wec = warning_data_wec.astype(dtlist)
-
-        dtlist = warning_data_rtu.dtype.descr
-        dtlist[0] = (dtlist[0][0], '<f4')
-        dtlist = np.dtype(dtlist)
-        self.warning_data_rtu = warning_data_rtu.astype(dtlist)
-
-        # Add 2 extra columns to scada - Inverter_averages and
+        scada_data = read_csv_data(csv_file, dtype=(
+            '<i8', '<f4', '<f4', '<f4', '<f4', '<f4', '<f4', '<f4', '<f4',
+            '<f4', '<f4', '<f4', '<f4', '<f4', '<f4', '<f4', '<f4', '<f4',
+            '<f4', '<f4', '<f4', '<f4', '<f4', '<f4', '<f4', '<f4', '<f4',
+            '<f4', '<f4', '<f4', '<f4', '<f4', '<f4', '<f4', '<f4', '<f4',
+            '<f4', '<f4', '<f4', '<f4', '<f4', '<f4', '<f4', '<f4', '<f4',
+            '<f4', '<f4', '<f4', '<f4', '<f4', '<f4', '<f4', '<f4', '<f4',
+            '<f4', '<f4', '<f4', '<f4', '<f4', '<f4', '<f4', '<f4', '<f4'),
+            extra_fields=[('Inverter_averages', '<f4'),
+                          ('Inverter_std_dev', '<f4')])
+
+        # Fill in the 2 extra columns - Inverter_averages and
         # Inverter_std_dev, as features
         inverters = np.array([
             'CS101__Sys_1_inverter_1_cabinet_temp',
@@ -201,11 +300,17 @@ class WT_data(object):
             'CS101__Sys_2_inverter_2_cabinet_temp',
             'CS101__Sys_2_inverter_3_cabinet_temp',
             'CS101__Sys_2_inverter_4_cabinet_temp'])
-        means = pd.DataFrame(scada_data[inverters]).mean(axis=1).values
-        stds = pd.DataFrame(scada_data[inverters]).std(axis=1).values
-        self.scada_data = rec.append_fields(scada_data, [
-            'Inverter_averages', 'Inverter_std_dev'],
-            data=[means, stds], usemask=False)
+        # stack the temperatures into a plain 2-D array, rather than going
+        # through a DataFrame. Missing values are skipped, as pandas did:
+        inverter_temps = np.column_stack(
+            [scada_data[name] for name in inverters])
+        # (summed in float64, but stored as float32 like the other fields)
+        scada_data['Inverter_averages'] = np.nanmean(
+            inverter_temps, axis=1, dtype=np.float64)
+        scada_data['Inverter_std_dev'] = np.nanstd(
+            inverter_temps, axis=1, ddof=1, dtype=np.float64)
+
+        return scada_data
 
     def filter(
             self, scada_data, sw_data, sw_column_name,
@@ -228,7 +333,8 @@ class WT_data(object):
         ----------
         scada_data : ndarray
             SCADA data to be filtered. Must be the scada data obtained
-            from `import_data()`, or a subset of that data.
+            from `import_data()`, or a subset of that data. Its 'Time'
+            field must be in ascending order.
         sw_data : ndarray
             Status/Warning data to be used for reference timestamps.
             One of: `warning_data_rtu`, `warning_data_wec`, `status_data_rtu`,
@@ -323,68 +429,108 @@ class WT_data(object):
             corresponding to fault data.
         """
 
-        # Aggregate all the indices of sw_data from the passed sw_codes
-        # together:
-        sw_data_indices = np.array([], dtype='i')
-        for sw_code in sw_codes:
-            sw = np.where((
-                sw_data[sw_column_name] == sw_code))
-            sw_data_indices = np.sort(
-                np.concatenate((sw_data_indices, sw[0])))
-
-        if filter_type == 'fault_free':
-            filtered_scada_indices = self.__fault_free_filter(
-                scada_data, sw_data, sw_data_indices, time_delta_1,
-                time_delta_2)
-        elif filter_type == 'fault_case_1':
-            filtered_scada_indices = self.__fault_case_1_filter(
-                scada_data, sw_data, sw_data_indices, time_delta_1,
-                time_delta_2)
-        elif filter_type == 'fault_case_2':
-            filtered_scada_indices = self.__fault_case_2_filter(
-                scada_data, sw_data, sw_data_indices, time_delta_1,
-                time_delta_2)
-        elif filter_type == 'fault_case_3':
-            filtered_scada_indices = self.__fault_case_3_filter(
-                scada_data, sw_data, sw_data_indices, time_delta_1,
-                time_delta_2)
-        else:
+        # check the arguments before touching any of the data:
+        # each filter_type only differs in how the time bounds are found
+        bounds_filters = {
+            'fault_free': self.__fault_free_filter,
+            'fault_case_1': self.__fault_case_1_filter,
+            'fault_case_2': self.__fault_case_2_filter,
+            'fault_case_3': self.__fault_case_3_filter}
+        try:
+            bounds_filter = bounds_filters[filter_type]
+        except (KeyError, TypeError):
             raise ValueError(
                 'filter_type must be one of \'fault_free\', '
                 '\'fault_case_1\', \'fault_case_2\' or \'fault_case_3\'.')
-
-        if return_inverse is False:
-            return scada_data[filtered_scada_indices]
-        elif return_inverse is True:
-            # using a mask is the simplest way I know to get the inverse
-            mask = np.array([True]).repeat(len(scada_data))
-            mask[filtered_scada_indices] = False
-            return scada_data[mask]
-        else:
+        if return_inverse is not True and return_inverse is not False:
             raise ValueError('return_inverse must be True or False')
+        if (filter_type in ('fault_case_2', 'fault_case_3') and
+                time_delta_1 < time_delta_2):
+            raise ValueError("time_delta_1 must be greater than or equal to "
+                             "time_delta_2!")
+
+        # there's nothing to filter (e.g. an earlier filter left no data),
+        # and the bounds below need at least one SCADA timestamp
+        if len(scada_data) == 0:
+            return scada_data[:0]
+
+        # Aggregate all the indices of sw_data from the passed sw_codes
+        # together, checking against every code in a single pass:
+        sw_column = sw_data[sw_column_name]
+        sw_codes = np.asarray(sw_codes)
+        if np.can_cast(sw_codes.dtype, sw_column.dtype):
+            # np.isin is fastest when both arrays share a dtype
+            sw_codes = sw_codes.astype(sw_column.dtype)
+        sw_data_indices = np.flatnonzero(np.isin(sw_column, sw_codes))
+
+        # the helpers only ever need the timestamps, so pull them out of
+        # the structured arrays once here rather than on every access,
+        # as int64 seconds so the time deltas are added exactly:
+        scada_time = self.__int64_seconds(scada_data['Time'])
+        sw_time = self.__int64_seconds(sw_data['Time'])
+        time_delta_1 = int(time_delta_1)
+        time_delta_2 = int(time_delta_2)
+
+        lower_times, upper_times = bounds_filter(
+            scada_time, sw_time, sw_data_indices, time_delta_1, time_delta_2)
+
+        starts, ends = self.__scada_ranges_between(
+            scada_time, lower_times, upper_times)
+
+        # mark where each range starts and ends, and a running sum turns
+        # that into a boolean mask over scada_data. The ranges neither
+        # overlap nor touch, so no two marks land on the same index:
+        range_edges = np.zeros(len(scada_data) + 1, dtype=np.int8)
+        range_edges[starts] = 1
+        range_edges[ends] = -1
+        filtered_mask = np.cumsum(range_edges[:-1], dtype=np.int8) > 0
+
+        if return_inverse:
+            filtered_mask = ~filtered_mask
+
+        return scada_data[filtered_mask]
+
+    def __int64_seconds(self, time):
+        """Returns a timestamp column as a contiguous int64 array of
+        seconds.
+
+        Parameters
+        ----------
+        time: ndarray
+            'Time' field of the SCADA or status/warning data. Either
+            numeric (int64 seconds, as returned by `import_data()`) or
+            datetime64.
+
+        Returns
+        -------
+        int_time: ndarray
+            `time` in whole seconds, as a contiguous 1-D int64 array.
+        """
+        if time.dtype.kind == 'M':
+            time = time.astype('datetime64[s]', copy=False).view('i8')
+        return np.ascontiguousarray(time, dtype=np.int64)
 
     def __fault_free_filter(
-            self, scada_data, sw_data, sw_data_indices, time_delta_1,
+            self, scada_time, sw_time, sw_data_indices, time_delta_1,
             time_delta_2):
-        """Returns indices of fault-free SCADA data.
+        """Returns time bounds of fault-free SCADA data.
 
         The function gets a timestamp of time_delta_1 after the start of
         each status/warning which correspond to fault-free operation, and
-        time_delta_2 before the status/warning ends. It returns indices
-        of scada_data which fall between these time stamps.
+        time_delta_2 before the status/warning ends. It returns these
+        time stamps, to be matched up with scada_time in `filter()`.
 
         Parameters
         ----------
-        scada_data: ndarray
-            SCADA data to be filtered. Must be the scada data obtained
-            from import_data(), or a subset of that data.
-        sw_data: ndarray
-            Status/Warning data to be used for reference timestamps. One
-            of: warning_data_rtu, warning_data_wec, status_data_rtu,
-            status_data_wec.
+        scada_time: ndarray
+            'Time' field of the SCADA data to be filtered, as a
+            contiguous 1-D int64 array in ascending order.
+        sw_time: ndarray
+            'Time' field of the status/warning data to be used for
+            reference timestamps, as a contiguous 1-D int64 array.
         sw_data_indices: ndarray
-            Indices of the sw_data whose timestamps will be used
-            to match up with scada_data. Should be obtained from
+            Indices of sw_time whose timestamps will be used
+            to match up with scada_time. Should be obtained from
             WT_data.filter() function.
         time_delta_1: integer
             Time AFTER normal operation begins from which to include
@@ -394,46 +540,34 @@ class WT_data(object):
             scada_data indices
         Returns
         -------
-        fault_free_scada_indices: ndarray
-            indices of scada_data which correspond to fault-free
-            operation
+        fault_free_bounds: tuple of ndarrays
+            (lower_times, upper_times) of each period of fault-free
+            operation. SCADA data from a lower time up to (but not
+            including) its upper time is fault-free.
         """
-        fault_free_scada_indices = np.array([], dtype='i')
-        for sw_data_index in sw_data_indices:
-            # fault_free_scada_indices for fault-free data are normally
-            # between time_delta_1 AFTER each instance of
-            # sw_data_indices, and time_delta_2 BEFORE the next general
-            # entry of sw_data (i.e. sw_data_indices + 1):
-            if sw_data[sw_data_index] != sw_data[-1]:
-                sf = np.where(
-                    (scada_data['Time'] >=
-                        sw_data['Time'][sw_data_index] + time_delta_1) &
-                    (scada_data['Time'] <
-                        sw_data['Time'][sw_data_index + 1] - time_delta_2))
-            # However, if the current sw_data_index represents sw_data[
-            # -1], then we use time_delta_2 before scada_data['Time'][
-            # -1] as the upper time limit for finding
-            # fault_free_scada_indices. This is because sw_data[
-            # sw_data_index + 1] does not exist, and we don't know if
-            # the sw_code will change after scada_data['Time'][-1]:
-            else:
-                sf = np.where(
-                    (scada_data['Time'] >=
-                        sw_data['Time'][sw_data_index] + time_delta_1) &
-                    (scada_data['Time'] <
-                        scada_data['Time'][-1] - time_delta_2))
-
-            fault_free_scada_indices = np.concatenate(
-                (fault_free_scada_indices, sf[0]), axis=0)
-
-        fault_free_scada_indices = np.unique(fault_free_scada_indices)
-
-        return fault_free_scada_indices
+        # fault_free_scada_indices for fault-free data are normally
+        # between time_delta_1 AFTER each instance of
+        # sw_data_indices, and time_delta_2 BEFORE the next general
+        # entry of sw_data (i.e. sw_data_indices + 1):
+        lower_times = sw_time[sw_data_indices] + time_delta_1
+        has_next = sw_data_indices < len(sw_time) - 1
+        upper_times = np.empty(len(sw_data_indices), dtype=sw_time.dtype)
+        upper_times[has_next] = (
+            sw_time[sw_data_indices[has_next] + 1] - time_delta_2)
+        # However, if the current sw_data_index represents sw_data[
+        # -1], then we use time_delta_2 before scada_data['Time'][
+        # -1] as the upper time limit for finding
+        # fault_free_scada_indices. This is because sw_data[
+        # sw_data_index + 1] does not exist, and we don't know if
+        # the sw_code will change after scada_data['Time'][-1]:
+        upper_times[~has_next] = scada_time[-1] - time_delta_2
+
+        return lower_times, upper_times
 
     def __fault_case_1_filter(
-            self, scada_data, sw_data, sw_data_indices, time_delta_1,
+            self, scada_time, sw_time, sw_data_indices, time_delta_1,
             time_delta_2):
-        """Returns indices of SCADA data corresponding to faulty
+        """Returns time bounds of SCADA data corresponding to faulty
         operation under a certain fault, according to 'case_1' option of
         the `filter_type` parameter in `filter()`.
 
@@ -442,21 +576,20 @@ class WT_data(object):
         The function gets a timestamp of time_delta_1 before the start
         of a certain status/warning which corresponds to faulty
         operation, and time_delta_2 after the status/warning ends. It
-        returns indices of scada_data which fall between these time
-        stamps.
+        returns these time stamps, to be matched up with scada_time in
+        `filter()`.
 
         Parameters
         ----------
-        scada_data: ndarray
-            SCADA data to be filtered. Must be the scada data obtained
-            from import_data(), or a subset of that data.
-        sw_data: ndarray
-            Status/Warning data to be used for reference timestamps. One
-            of: warning_data_rtu, warning_data_wec, status_data_rtu,
-            status_data_wec.
+        scada_time: ndarray
+            'Time' field of the SCADA data to be filtered, as a
+            contiguous 1-D int64 array in ascending order.
+        sw_time: ndarray
+            'Time' field of the status/warning data to be used for
+            reference timestamps, as a contiguous 1-D int64 array.
         sw_data_indices: ndarray
-            Indices of the sw_data whose timestamps will be used
-            to match up with scada_data. Should be obtained from
+            Indices of sw_time whose timestamps will be used
+            to match up with scada_time. Should be obtained from
             WT_data.filter() function.
         time_delta_1: integer
             Time BEFORE faulty operation begins from which to include
@@ -466,47 +599,34 @@ class WT_data(object):
             scada_data indices
         Returns
         -------
-        fault_scada_indices: ndarray
-            indices of scada_data which correspond to fault-free
-            operation
+        fault_bounds: tuple of ndarrays
+            (lower_times, upper_times) of each period of faulty
+            operation. SCADA data from a lower time up to (but not
+            including) its upper time corresponds to faulty operation.
         """
-        fault_scada_indices = np.array([], dtype='i')
-
-        for sw_data_index in sw_data_indices:
-            # fault_scada_indices for fault data are normally
-            # between time_delta_1 BEFORE each instance of
-            # sw_data_indices, and time_delta_2 AFTER the next general
-            # entry of sw_data (i.e. sw_data_indices + 1):
-            if sw_data[sw_data_index] != sw_data[-1]:
-                sf = np.where(
-                    (scada_data['Time'] >=
-                        sw_data['Time'][sw_data_index] - time_delta_1) &
-                    (scada_data['Time'] <
-                        sw_data['Time'][sw_data_index + 1] + time_delta_2))
-            # However, if the current sw_data_index represents sw_data[
-            # -1], then we use scada_data['Time'][-1] as the upper time
-            # limit for finding fault_scada_indices. This is because
-            # sw_data[sw_data_index + 1] does not exist, and we don't
-            # know if the sw_code will change after
-            # scada_data['Time'][-1]:
-            else:
-                sf = np.where(
-                    (scada_data['Time'] >=
-                        sw_data['Time'][sw_data_index] - time_delta_1) &
-                    (scada_data['Time'] <
-                        scada_data['Time'][-1]))
-
-            fault_scada_indices = np.concatenate(
-                (fault_scada_indices, sf[0]), axis=0)
-
-        fault_scada_indices = np.unique(fault_scada_indices)
-
-        return fault_scada_indices
+        # fault_scada_indices for fault data are normally
+        # between time_delta_1 BEFORE each instance of
+        # sw_data_indices, and time_delta_2 AFTER the next general
+        # entry of sw_data (i.e. sw_data_indices + 1):
+        lower_times = sw_time[sw_data_indices] - time_delta_1
+        has_next = sw_data_indices < len(sw_time) - 1
+        upper_times = np.empty(len(sw_data_indices), dtype=sw_time.dtype)
+        upper_times[has_next] = (
+            sw_time[sw_data_indices[has_next] + 1] + time_delta_2)
+        # However, if the current sw_data_index represents sw_data[
+        # -1], then we use scada_data['Time'][-1] as the upper time
+        # limit for finding fault_scada_indices. This is because
+        # sw_data[sw_data_index + 1] does not exist, and we don't
+        # know if the sw_code will change after
+        # scada_data['Time'][-1]:
+        upper_times[~has_next] = scada_time[-1]
+
+        return lower_times, upper_times
 
     def __fault_case_2_filter(
-            self, scada_data, sw_data, sw_data_indices, time_delta_1,
+            self, scada_time, sw_time, sw_data_indices, time_delta_1,
             time_delta_2):
-        """Returns indices of SCADA data leading up to a certain fault,
+        """Returns time bounds of SCADA data leading up to a certain fault,
         according to 'fault_case_2' option of the `filter_type` parameter in
         `filter()`.
 
@@ -515,20 +635,19 @@ class WT_data(object):
         The function gets timestamps for the times between time_delta_1
         and time_delta_2 before the start of a certain status/warning
         which corresponds to the start of faulty operation. It returns
-        indices of scada_data which fall between these time stamps.
+        these time stamps, to be matched up with scada_time in `filter()`.
 
         Parameters
         ----------
-        scada_data: ndarray
-            SCADA data to be filtered. Must be the scada data obtained
-            from import_data(), or a subset of that data.
-        sw_data: ndarray
-            Status/Warning data to be used for reference timestamps. One
-            of: warning_data_rtu, warning_data_wec, status_data_rtu,
-            status_data_wec.
+        scada_time: ndarray
+            'Time' field of the SCADA data to be filtered, as a
+            contiguous 1-D int64 array in ascending order.
+        sw_time: ndarray
+            'Time' field of the status/warning data to be used for
+            reference timestamps, as a contiguous 1-D int64 array.
         sw_data_indices: ndarray
-            Indices of the sw_data whose timestamps will be used
-            to match up with scada_data. Should be obtained from
+            Indices of sw_time whose timestamps will be used
+            to match up with scada_time. Should be obtained from
             WT_data.filter() function.
         time_delta_1: integer
             Time BEFORE faulty operation begins from which to include
@@ -539,34 +658,20 @@ class WT_data(object):
             including scada_data indices. Must be less than time_delta_1
         Returns
         -------
-        fault_scada_indices: ndarray
-            indices of scada_data which correspond to fault-free
-            operation
+        fault_bounds: tuple of ndarrays
+            (lower_times, upper_times) of each period of faulty
+            operation. SCADA data from a lower time up to (but not
+            including) its upper time corresponds to faulty operation.
         """
-        if time_delta_1 < time_delta_2:
-            raise ValueError("time_delta_1 must be greater than or equal to "
-                             "time_delta_2!")
-        fault_scada_indices = np.array([], dtype='i')
         # fault_scada_indices for fault data are between time_delta_1
         # and time_delta_2 before each instance of sw_data_indices:
-        for sw_data_index in sw_data_indices:
-            sf = np.where(
-                (scada_data['Time'] >=
-                    sw_data['Time'][sw_data_index] - time_delta_1) &
-                (scada_data['Time'] <
-                    sw_data['Time'][sw_data_index] - time_delta_2))
-
-            fault_scada_indices = np.concatenate(
-                (fault_scada_indices, sf[0]), axis=0)
-
-        fault_scada_indices = np.unique(fault_scada_indices)
-
-        return fault_scada_indices
+        fault_times = sw_time[sw_data_indices]
+        return fault_times - time_delta_1, fault_times - time_delta_2
 
     def __fault_case_3_filter(
-            self, scada_data, sw_data, sw_data_indices, time_delta_1,
+            self, scada_time, sw_time, sw_data_indices, time_delta_1,
             time_delta_2):
-        """Returns indices of SCADA data leading up to a certain fault,
+        """Returns time bounds of SCADA data leading up to a certain fault,
         according to 'case_3' option of the `filter_type` parameter in
         `filter()`.
 
@@ -574,24 +679,23 @@ class WT_data(object):
 
         The function gets timestamps for the times between `time_delta_1`
         and `time_delta_2` before a certain fault starts. It returns
-        indices of scada_data which fall between these time stamps,
-        but ONLY IF no other instance of this fault occured during this
-        period. Therefore, it contains only data of normal operation
+        these time stamps, but ONLY IF no other instance of this fault
+        occured during this period. Therefore, scada_data falling
+        between them contains only data of normal operation
         (or possibly under faulty operation, but of a different fault)
         which led up to the fault.
 
         Parameters
         ----------
-        scada_data: ndarray
-            SCADA data to be filtered. Must be the scada data obtained
-            from `import_data()`, or a subset of that data.
-        sw_data: ndarray
-            Status/Warning data to be used for reference timestamps. One
-            of: `warning_data_rtu`, `warning_data_wec`, `status_data_rtu`,
-            `status_data_wec`.
+        scada_time: ndarray
+            'Time' field of the SCADA data to be filtered, as a
+            contiguous 1-D int64 array in ascending order.
+        sw_time: ndarray
+            'Time' field of the status/warning data to be used for
+            reference timestamps, as a contiguous 1-D int64 array.
         sw_data_indices: ndarray
-            Indices of the sw_data whose timestamps will be used
-            to match up with scada_data. Should be obtained from
+            Indices of sw_time whose timestamps will be used
+            to match up with scada_time. Should be obtained from
             WT_data.filter() function.
         time_delta_1: integer
             Time BEFORE faulty operation begins from which to include
@@ -602,44 +706,88 @@ class WT_data(object):
             including scada_data indices. Must be less than `time_delta_1`
         Returns
         -------
-        fault_scada_indices: ndarray
-            indices of `scada_data` which correspond to fault-free
-            operation
+        fault_bounds: tuple of ndarrays
+            (lower_times, upper_times) of each period leading up to a
+            fault. SCADA data from a lower time up to (but not
+            including) its upper time leads up to a fault.
         """
-        if time_delta_1 < time_delta_2:
-            raise ValueError("time_delta_1 must be greater than or equal to "
-                             "time_delta_2!")
-        fault_scada_indices = np.array([], dtype='i')
         # `filtered_scada_instances` for fault data are only returned
         # between `time_delta_1` and `time_delta_2` before a fault, if the
         # same type of fault does not occur in that period.
 
         # the first fault instance (or, if there's only one fault
-        # instance) will no overlap with a previous one, so selecting
-        # these indices is straighforward:
-        fault_scada_indices = np.where(
-            (scada_data['Time'] >= sw_data[sw_data_indices[0]]['Time'] -
-                time_delta_1) &
-            (scada_data['Time'] < sw_data[sw_data_indices[0]]['Time'] -
-                time_delta_2))[0]
+        # instance) will no overlap with a previous one, so it is always
+        # included:
+        keep = np.ones(len(sw_data_indices), dtype=bool)
         # The rest of the indices must be picked from times when the
         # previous fault instance does not overlap with the current
         # fault instance - time_delta_1:
-        for i in range(1, len(sw_data_indices)):
-            if (sw_data[sw_data_indices[i]]['Time'] - time_delta_1 >=
-                    sw_data[sw_data_indices[i - 1] + 1]['Time']):
-                sf = np.where(
-                    (scada_data['Time'] >=
-                        sw_data['Time'][sw_data_indices[i]] - time_delta_1) &
-                    (scada_data['Time'] <
-                        sw_data['Time'][sw_data_indices[i]] - time_delta_2))
+        keep[1:] = (sw_time[sw_data_indices[1:]] - time_delta_1 >=
+                    sw_time[sw_data_indices[:-1] + 1])
+
+        fault_times = sw_time[sw_data_indices[keep]]
+        return fault_times - time_delta_1, fault_times - time_delta_2
 
-                fault_scada_indices = np.concatenate(
-                    (fault_scada_indices, sf[0]))
+    def __scada_ranges_between(self, scada_time, lower_times,
+                               upper_times):
+        """Returns ranges of SCADA data whose timestamps fall inside any
+        of a set of time intervals.
 
-        fault_scada_indices = np.unique(fault_scada_indices)
+        `scada_time` is in ascending order, so the start and end of
+        every interval can be found with a binary search, rather than
+        scanning the whole of `scada_time` once per interval.
 
-        return fault_scada_indices
+        Parameters
+        ----------
+        scada_time: ndarray
+            'Time' field of the SCADA data to be filtered, as a
+            contiguous 1-D int64 array in ascending order.
+        lower_times: ndarray
+            Start time of each interval. Timestamps greater than or
+            equal to this are included.
+        upper_times: ndarray
+            End time of each interval. Timestamps strictly less than
+            this are included.
+
+        Returns
+        -------
+        starts: ndarray
+            Start index (inclusive) of each range of scada_time which
+            falls inside at least one of the intervals
+        ends: ndarray
+            End index (exclusive) of each range. The ranges are sorted
+            and do not overlap or touch.
+        """
+        # search for every bound in a single call, with the bounds cast
+        # to the dtype of scada_time up front so searchsorted doesn't
+        # have to convert them on the fly
+        bounds = np.concatenate([lower_times, upper_times]).astype(
+            scada_time.dtype, copy=False)
+        bound_indices = np.searchsorted(scada_time, bounds, side='left')
+        starts = bound_indices[:len(lower_times)]
+        ends = bound_indices[len(lower_times):]
+
+        # merge overlapping [start, end) pairs, so each index is only
+        # covered by a single range:
+        non_empty = ends > starts
+        starts = starts[non_empty]
+        ends = ends[non_empty]
+        # the bounds usually come in time order already without
+        # overlapping (e.g. for fault_case_3), so only sort and merge
+        # when that's not the case:
+        if np.all(starts[1:] > ends[:-1]):
+            return starts, ends
+        order = np.argsort(starts, kind='mergesort')
+        starts = starts[order]
+        ends = np.maximum.accumulate(ends[order])
+        # a new range begins wherever a start is past the furthest end
+        # seen so far; the end of each range is then the running maximum
+        # just before the next range begins:
+        new_range = np.ones(len(starts), dtype=bool)
+        new_range[1:] = starts[1:] > ends[:-1]
+        range_end = np.append(new_range[1:], True)[:len(starts)]
+
+        return starts[new_range], ends[range_end]
 
     def __get_fault_free_scada_data(self):
         """Uses `WT_data.filter()` to get fault free data, according to
@@ -726,6 +874,11 @@ class WT_data(object):
             faults
         mains_failure_fault_scada_data: ndarray
             An array of SCADA data corresponding to mains failure faults
+
+        Notes
+        -----
+        The results are remembered, so calling this again with the same
+        arguments returns the same arrays without filtering them again.
         """
 
         # Main status of the faults to be included:
@@ -735,6 +888,10 @@ class WT_data(object):
             raise ValueError('filter_type must be one of \'fault_case_1\', '
                              '\'fault_case_2\' or \'fault_case_3\'.')
 
+        args = (filter_type, time_delta_1, time_delta_2)
+        if args in self.__all_fault_data:
+            return self.__all_fault_data[args]
+
         all_faults_scada_data = self.filter(
             self.scada_data, self.status_data_wec, "Main_Status", filter_type,
             False, time_delta_1, time_delta_2, *faults)
@@ -754,9 +911,12 @@ class WT_data(object):
             self.scada_data, self.status_data_wec, "Main_Status", filter_type,
             False, time_delta_1, time_delta_2, 9)
 
-        return all_faults_scada_data, feeding_fault_scada_data, \
-            mains_failure_fault_scada_data, aircooling_fault_scada_data, \
-            excitation_fault_scada_data, generator_heating_fault_scada_data
+        self.__all_fault_data[args] = (
+            all_faults_scada_data, feeding_fault_scada_data,
+            mains_failure_fault_scada_data, aircooling_fault_scada_data,
+            excitation_fault_scada_data, generator_heating_fault_scada_data)
+
+        return self.__all_fault_data[args]
 
     def get_test_train_data(
             self, features, fault_data_sets, fault_free_scada_data_set=None,
@@ -827,34 +987,27 @@ class WT_data(object):
         if fault_free_scada_data_set is None:
             fault_free_scada_data_set = self.fault_free_scada_data
 
-        fault_free_labels = np.zeros(len(fault_free_scada_data_set), dtype=int)
-
-        # we create the final_data_set array which will eventually
-        # contain both fault and fault-free data, and their labels. We
-        # need them with their labels in the same array because when we
-        # shuffle it all up we want the labels to remain correct
-        final_data_set = rec.append_fields(
-            fault_free_scada_data_set[features], ['label'],
-            data=[fault_free_labels], usemask=False)
-        # append the "fault" data set(s) to the final_data_set
-        i = 1
-        for fault_data_set in fault_data_sets:
-            labels = np.array([i]).repeat(len(fault_data_set))
-            fault_data_set = rec.append_fields(
-                fault_data_set[features], ['label'], data=[labels],
-                usemask=False)
-            final_data_set = np.concatenate([final_data_set, fault_data_set])
-            i += 1
+        # we put the fault and fault-free data straight into one
+        # contiguous float32 array of features, with their labels in a
+        # separate array. The two are shuffled together further down so
+        # the labels stay correct
+        data_sets = [fault_free_scada_data_set] + fault_data_sets
+        set_ends = np.cumsum([len(data_set) for data_set in data_sets])
+        X = np.empty((set_ends[-1], len(features)), dtype=np.float32)
+        y = np.empty(set_ends[-1], dtype=int)
+        # the fault-free data is labelled 0, and the fault data set(s)
+        # 1, 2, ... in the order they're given
+        start = 0
+        for label, (data_set, end) in enumerate(zip(data_sets, set_ends)):
+            for i, feature in enumerate(features):
+                X[start:end, i] = data_set[feature]
+            y[start:end] = label
+            start = end
         # shuffle it all up to make it totez random lolz
-        np.random.shuffle(final_data_set)
-
-        # here we're just separating out the labels from the data, cos that's
-        # what sklearn wants from us.
-        y = final_data_set['label']
-        # drop that extra field since it's no longer needed
-        X = rec.drop_fields(final_data_set, ['label'], False).view(
-            np.float32).reshape(len(final_data_set),
-                                len(final_data_set.dtype) - 1)
+        shuffled = np.random.permutation(len(X))
+        X = X[shuffled]
+        y = y[shuffled]
+
         # finally, we get to create that training and test data!
         if normalize is True:
             X_norm = prep.normalize(X)
@@ -885,6 +1038,452 @@ class WT_data(object):
         return X_train, X_test, y_train, y_test, X_train_bal, y_train_bal
 
 
+def read_csv_data(csv_file, dtype, extra_fields=(), chunk_size=100000):
+    """Returns a csv file imported as a structured array.
+
+    The csv is parsed with pandas' C parser, which is much quicker
+    than np.genfromtxt. Dates in the 'Time' column are converted to
+    Unix timestamps.
+
+    Parameters
+    ----------
+    csv_file: str
+        The csv file to be imported. Its first line must be the
+        header.
+    dtype: tuple of str
+        The dtype of each field, in the same order as the csv
+        columns. 'Time' should be '<i8', to hold whole seconds.
+    extra_fields: list of (name, dtype) tuples, optional
+        Fields to add after the csv columns. These are left
+        uninitialised, to be filled in by the caller.
+    chunk_size: int, optional (default=100000)
+        The number of csv rows parsed at a time, so only that many
+        are held in a DataFrame at once.
+
+    Returns
+    -------
+    data: ndarray
+        The csv data as a structured array
+    """
+    # genfromtxt only parses the header (and first row) here, so the
+    # field names are cleaned up the same way as they always were:
+    with open(csv_file, 'rb') as f:
+        names = np.genfromtxt(
+            f, dtype=None, delimiter=",", names=True,
+            max_rows=1).dtype.names
+    dtype = np.dtype(list(zip(names, dtype)) + list(extra_fields))
+
+    # count the rows first, so the array is only allocated once and
+    # then filled in field by field, one chunk at a time
+    with open(csv_file, 'rb') as f:
+        n_rows = sum(1 for _ in f) - 1
+    data = np.empty(n_rows, dtype=dtype)
+
+    n_read = 0
+    for csv_chunk in pd.read_csv(
+            csv_file, header=0, names=names, engine='c',
+            chunksize=chunk_size, dtype={
+                name: str if name == 'Time' or dtype[name].kind in 'Uib'
+                else dtype[name] for name in names}):
+        data_chunk = data[n_read:n_read + len(csv_chunk)]
+        for name in names:
+            if name == 'Time':
+                data_chunk[name] = unix_time(csv_chunk[name].values)
+            elif dtype[name].kind == 'U':
+                data_chunk[name] = csv_chunk[name].fillna('').values
+            elif dtype[name].kind == 'i':
+                # read_csv can't give blank integers, so they're read
+                # as strings. Like genfromtxt, blank (or unreadable)
+                # ones are -1, and any decimals are truncated
+                data_chunk[name] = pd.to_numeric(
+                    csv_chunk[name], errors='coerce').fillna(-1).values
+            elif dtype[name].kind == 'b':
+                # genfromtxt only reads 'true' (in any case) as True.
+                # Anything else, including blanks and '1', is False
+                data_chunk[name] = (
+                    csv_chunk[name].str.lower() == 'true').values
+            else:
+                data_chunk[name] = csv_chunk[name].values
+        n_read += len(csv_chunk)
+
+    # (blank lines are counted above, but skipped by read_csv)
+    return data[:n_read]
+
+
+def unix_time(time):
+    """Converts date strings to Unix timestamps.
+
+    Parameters
+    ----------
+    time: ndarray
+        Dates in the format "%d/%m/%Y %H:%M:%S"
+
+    Returns
+    -------
+    unix_time: ndarray
+        The dates as Unix timestamps, in whole seconds (int64)
+    """
+    # parse every date at once, rather than with strptime row by row.
+    # cache=True means repeated dates are only parsed once:
+    time = pd.to_datetime(time, format="%d/%m/%Y %H:%M:%S", cache=True)
+    time = time - pd.Timestamp(dt.datetime.fromtimestamp(3600))
+
+    return np.asarray(time // pd.Timedelta(seconds=1), dtype=np.int64)
+
+
+def load_turbine(turbine_file='wt.pkl', **data_files):
+    """Create a `WT_data` instance, or load the one saved from last time.
+
+    Creating a `WT_data` instance means importing and filtering all the
+    csv files, which is slow. The first time this is called, the new
+    instance is saved to `turbine_file` with joblib. After that it's
+    loaded from there (memory-mapped, read-only), as long as it was made
+    from the same csv files and is newer than all of them, and newer
+    than this module (so a change to how the data is imported isn't
+    missed). Otherwise it is created and saved again. A missing csv file
+    also means it is created again.
+
+    Parameters
+    ----------
+    turbine_file: str, optional (default='wt.pkl')
+        Where the `WT_data` instance is saved
+    **data_files:
+        Any csv files to pass to `WT_data()`, e.g.
+        `scada_data_file='Source Data/SCADA_data.csv'`
+
+    Returns
+    -------
+    turbine: WT_data
+        The turbine data
+    """
+    source_files = inspect.signature(WT_data).bind(**data_files)
+    source_files.apply_defaults()
+    source_files = source_files.arguments
+
+    if os.path.exists(turbine_file):
+        saved_time = os.path.getmtime(turbine_file)
+        if all(os.path.exists(file_name) and
+               os.path.getmtime(file_name) < saved_time
+               for file_name in list(source_files.values()) + [__file__]):
+            turbine = joblib.load(turbine_file, mmap_mode='r')
+            if all(getattr(turbine, name) == source_file
+                   for name, source_file in source_files.items()):
+                return turbine
+
+    turbine = WT_data(**source_files)
+    joblib.dump(turbine, turbine_file)
+
+    return turbine
+
+
+def cached_turbine_functions(turbine, location='.cache'):
+    """Cache `turbine`'s filtered data sets and test/train data on disk.
+
+    The filtered data sets and the test/train data made from them only
+    need to be worked out the first time a script is run. After that
+    they're loaded from `location` (memory-mapped, read-only). Note this
+    means the same random test/train split is used each time, until the
+    cache folder is cleared.
+
+    The results only depend on the arguments passed, so `turbine` itself
+    is left out of the cache keys. Otherwise all its imported data would
+    be hashed on every call, and the keys would change as more of it gets
+    imported. For the same reason, always pass the no-fault data to the
+    cached `get_test_train_data()`, rather than leaving it to default to
+    `turbine.fault_free_scada_data`.
+
+    Parameters
+    ----------
+    turbine: WT_data
+        The turbine data
+    location: str, optional (default='.cache')
+        The folder the results are cached in
+
+    Returns
+    -------
+    memory: joblib.Memory
+        The cache, to use for anything else worth caching
+    filter_cached: function
+        `turbine.filter()`, cached
+    get_test_train_data_cached: function
+        `turbine.get_test_train_data()`, cached
+    """
+    memory = joblib.Memory(location, mmap_mode='r', verbose=0)
+    filter_cached = memory.cache(turbine.filter, ignore=['self'])
+    get_test_train_data_cached = memory.cache(
+        turbine.get_test_train_data, ignore=['self'])
+
+    return memory, filter_cached, get_test_train_data_cached
+
+
+def prune_correlated_features(data, features, threshold=0.98):
+    """Drop features which are highly correlated with another feature.
+
+    Features are kept in the order given, and each one is dropped if its
+    absolute correlation with any feature already kept is above
+    `threshold`. A smaller set of features makes for less work fitting
+    and predicting with an SVM, and the dropped ones add little.
+
+    Parameters
+    ----------
+    data: ndarray
+        SCADA data to work out the correlations from, e.g. the
+        fault-free data
+    features: list of strings
+        The `data` column names to choose from
+    threshold: float, optional (default=0.98)
+        The absolute correlation above which a feature is dropped
+
+    Returns
+    -------
+    kept_features: list of strings
+        The features which weren't dropped
+    """
+    X = np.empty((len(features), len(data)))
+    for i, feature in enumerate(features):
+        X[i] = data[feature]
+    correlated = np.abs(np.corrcoef(X)) > threshold
+
+    kept = []
+    for i in range(len(features)):
+        if not correlated[i, kept].any():
+            kept.append(i)
+
+    return [features[i] for i in kept]
+
+
+def gsvm_ru_undersample(
+        X_train, y_train, estimator=None, n_rounds=5, ratio=2,
+        random_state=None):
+    """Undersample the fault-free class, keeping its support vectors.
+
+    This follows the repetitive undersampling of GSVM-RU. Each round an
+    SVM is fitted to all the fault samples plus a random subset of the
+    fault-free ones, and the samples which end up as support vectors are
+    kept. The fault-free samples which were never a support vector are
+    dropped, as they have little bearing on the decision boundary.
+
+    Parameters
+    ----------
+    X_train: ndarray
+        Training data samples
+    y_train: ndarray
+        Training data labels, where 0 is fault-free
+    estimator: SVC, optional
+        The SVM fitted in each round. Defaults to `SVC(C=1)`.
+    n_rounds: int, optional (default=5)
+        The number of undersampling rounds
+    ratio: int, optional (default=2)
+        The number of fault-free samples drawn each round, as a multiple
+        of the number of fault samples
+    random_state: int or RandomState, optional
+        Seed for drawing the fault-free samples
+
+    Returns
+    -------
+    X_train_ru: ndarray
+        The undersampled training data samples
+    y_train_ru: ndarray
+        The undersampled training data labels
+    """
+    if estimator is None:
+        estimator = SVC(C=1)
+    random_state = utils.check_random_state(random_state)
+
+    fault_free = np.flatnonzero(y_train == 0)
+    faults = np.flatnonzero(y_train != 0)
+    n_draw = min(len(fault_free), len(faults) * ratio)
+
+    kept = np.zeros(len(y_train), dtype=bool)
+    kept[faults] = True
+    for _ in range(n_rounds):
+        drawn = np.concatenate([faults, random_state.choice(
+            fault_free, n_draw, replace=False)])
+        clf = clone(estimator).fit(X_train[drawn], y_train[drawn])
+        kept[drawn[clf.support_]] = True
+
+    return X_train[kept], y_train[kept]
+
+
+def svm_search(
+    X_train, y_train, parameter_space, search_type=RandomizedSearchCV,
+        score='recall_weighted', iid=True, n_jobs=-1,
+        max_precomputed_samples=10000, approximate_kernels=True,
+        search_kwargs=None, memory=None, cache_size=1000):
+    """Search for the best SVM hyperparameters.
+
+    Any linear kernel in `parameter_space` is searched using LinearSVC
+    (liblinear), which is much quicker to train than the linear kernel of
+    SVC. For the rbf kernel, the kernel matrix is worked out once for
+    each gamma and searched over with a precomputed kernel, so it isn't
+    recalculated for every C, class_weight and cv fold. Where there are
+    too many samples for that, the rbf kernel is approximated with a
+    Nystroem feature map followed by LinearSVC, as is the poly kernel
+    (unless `approximate_kernels` is False). The remaining kernels are
+    searched using SVC, and whichever search scores best is returned.
+
+    Parameters
+    ----------
+    X_train: ndarray
+        Training data samples
+    y_train: ndarray
+        Training data labels
+    parameter_space: dict
+        The hyperparameters to search, as given to `search_type`. For a
+        RandomizedSearchCV these can be lists or scipy.stats
+        distributions (though an rbf kernel is only precomputed when the
+        gammas are a list).
+    search_type: GridSearchCV or RandomizedSearchCV, optional
+        The type of search to carry out
+    score: str, optional (default='recall_weighted')
+        The scoring used to choose the best hyperparameters
+    iid: Boolean, optional (default=True)
+        Passed on to `search_type`
+    n_jobs: int, optional (default=-1)
+        The number of cores the candidates and cv folds are fitted over
+    max_precomputed_samples: int, optional (default=10000)
+        The rbf kernel matrix is only precomputed when there are at most
+        this many training samples, as it takes up n_samples ** 2 floats.
+        Every worker also slices its own copy of it for each cv fold, so
+        at most 4 workers are used for the precomputed searches
+    approximate_kernels: Boolean, optional (default=True)
+        Whether to search the poly kernel, and the rbf kernel when it
+        isn't precomputed, using Nystroem approximations of them. The
+        resulting Pipelines can't be fitted with sample weights (e.g.
+        for boosting), so set this to False if that is needed.
+    search_kwargs: dict, optional
+        Any other keyword arguments for `search_type`, e.g. n_iter or
+        pre_dispatch. These override the defaults set here.
+    memory: str or joblib.Memory, optional
+        Where to cache the fitted Nystroem feature maps, so they aren't
+        refitted for every C and class_weight searched with the same
+        gamma. Defaults to no caching.
+    cache_size: float, optional (default=1000)
+        The size of the kernel cache (in MB) of each SVC fitted. A bigger
+        cache means fewer kernel values are worked out again during
+        training. Note every SVC being fitted in parallel has its own
+        cache.
+
+    Returns
+    -------
+    clf: GridSearchCV or RandomizedSearchCV
+        The fitted search with the best score
+    """
+    # SVC and the kernel maps all work on float32 directly, so make sure
+    # the data is in that form (this doesn't copy data which already is)
+    X_train = np.ascontiguousarray(X_train, dtype=np.float32)
+
+    kernels = list(parameter_space.get('kernel', []))
+    # these are (estimator, parameter space, rbf gamma) for each search.
+    # The gamma is None unless the search is over a precomputed kernel
+    searches = []
+    if 'linear' in kernels:
+        kernels.remove('linear')
+        linear_space = {
+            param: values for param, values in parameter_space.items()
+            if param in ('C', 'class_weight')}
+        searches.append(
+            (LinearSVC(loss='hinge', max_iter=5000), linear_space, None))
+    gammas = parameter_space.get('gamma', ['auto'])
+    # scipy.stats distributions are sampled from, rather than listed
+    gammas_sampled = hasattr(gammas, 'rvs')
+
+    def nystroem_search(kernel):
+        nystroem_space = {
+            'svm__' + param: values
+            for param, values in parameter_space.items()
+            if param in ('C', 'class_weight')}
+        # (only the one kernel, but this shows it in best_params_)
+        nystroem_space['nys__kernel'] = [kernel]
+        if gammas_sampled:
+            nystroem_space['nys__gamma'] = gammas
+        else:
+            nystroem_space['nys__gamma'] = [
+                None if gamma == 'auto' else gamma for gamma in gammas]
+        if kernel == 'poly' and 'degree' in parameter_space:
+            nystroem_space['nys__degree'] = parameter_space['degree']
+        # coef0 and degree are set to match the defaults for SVC
+        nystroem_svm = Pipeline([
+            ('nys', Nystroem(kernel=kernel, degree=3, coef0=0,
+                             n_components=300, random_state=0)),
+            ('svm', LinearSVC(dual=False))], memory=memory)
+        return nystroem_svm, nystroem_space, None
+
+    if 'rbf' in kernels:
+        if (not gammas_sampled
+                and len(X_train) <= max_precomputed_samples):
+            kernels.remove('rbf')
+            rbf_space = {
+                param: values for param, values in parameter_space.items()
+                if param in ('C', 'class_weight')}
+            for gamma in gammas:
+                searches.append(
+                    (SVC(C=1, kernel='precomputed'), rbf_space, gamma))
+        elif (approximate_kernels
+                and len(X_train) > max_precomputed_samples):
+            kernels.remove('rbf')
+            searches.append(nystroem_search('rbf'))
+    if 'poly' in kernels and approximate_kernels:
+        kernels.remove('poly')
+        searches.append(nystroem_search('poly'))
+    if kernels or 'kernel' not in parameter_space:
+        svc_space = dict(parameter_space)
+        if kernels:
+            svc_space['kernel'] = kernels
+        searches.append(
+            (SVC(C=1, cache_size=cache_size), svc_space, None))
+
+    # 5 shuffled, stratified folds, which keep the proportion of each
+    # (imbalanced) class the same in every fold
+    folds = cval.StratifiedKFold(y_train, n_folds=5, shuffle=True,
+                                 random_state=0)
+
+    def fit_search(estimator, space, X, max_jobs=None):
+        search_args = {'cv': folds, 'scoring': score, 'iid': iid,
+                       'n_jobs': n_jobs, 'pre_dispatch': '2*n_jobs'}
+        search_args.update(search_kwargs or {})
+        if max_jobs is not None:
+            # (negative n_jobs count back from the number of cores)
+            search_args['n_jobs'] = (
+                max_jobs if search_args['n_jobs'] < 0
+                else min(search_args['n_jobs'], max_jobs))
+        # a randomized search can't sample more candidates than there are
+        # in a (now smaller) parameter space made up of lists
+        if issubclass(search_type, RandomizedSearchCV) and not any(
+                hasattr(values, 'rvs') for values in space.values()):
+            search_args['n_iter'] = min(search_args.get('n_iter', 10),
+                                        len(ParameterGrid(space)))
+        clf = search_type(estimator, space, **search_args)
+        return clf.fit(X, y_train)
+
+    best_clf = None
+    best_gamma = None
+    for estimator, space, gamma in searches:
+        if gamma is None:
+            clf = fit_search(estimator, space, X_train)
+        else:
+            # 'auto' is 1 / n_features, which rbf_kernel uses for None
+            kernel_matrix = rbf_kernel(
+                X_train, gamma=None if gamma == 'auto' else gamma)
+            clf = fit_search(estimator, space, kernel_matrix, max_jobs=4)
+        if best_clf is None or clf.best_score_ > best_clf.best_score_:
+            best_clf = clf
+            best_gamma = gamma
+
+    if best_gamma is not None:
+        # a precomputed kernel can only make predictions from the kernel
+        # of the test data, so fit the best rbf svm on the features once
+        # (it's already been scored), and use it as the search's best
+        # estimator
+        best_clf.best_params_ = dict(
+            best_clf.best_params_, kernel='rbf', gamma=best_gamma)
+        best_clf.best_estimator_ = SVC(
+            cache_size=cache_size, **best_clf.best_params_).fit(
+                X_train, y_train)
+
+    return best_clf
+
+
 def svm_class_and_score(
     X_train, y_train, X_test, y_test, labels, search_type=RandomizedSearchCV,
     parameter_space={
@@ -892,20 +1491,38 @@ def svm_class_and_score(
         'C': [0.01, .1, 1, 10, 100, 1000],
         'class_weight': [
             {0: 0.01}, {1: 1}, {1: 2}, {1: 10}, {1: 50}, 'balanced']},
-        score='recall_weighted', iid=True, bagged=False, svm_results=True):
+        score='recall_weighted', iid=True, bagged=False, svm_results=True,
+        n_jobs=-1, search_kwargs=None, memory=None, cache_size=1000,
+        X_search=None, y_search=None):
     """Build an SVM and return its scoring metrics
+
+    If `X_search` and `y_search` are given (e.g. an undersampled subset
+    of the training data), the hyperparameters are searched for using
+    them instead, and only the best SVM found is fitted on all of
+    `X_train`. That SVM replaces the search's `best_estimator_`, so it's
+    the one the search's `predict()` uses.
+
+    Returns
+    -------
+    clf: GridSearchCV or RandomizedSearchCV
+        The fitted search, with `best_params_` etc. as usual
+    bgg: BaggingClassifier
+        The fitted bagged SVM. Only returned if `bagged` is True
     """
     print("# Tuning hyper-parameters for %s" % score)
     print()
 
-    # Find the Hyperparameters
-    clf = search_type(SVC(C=1), parameter_space, cv=10,
-                      scoring=score, iid=iid)
-
-    # Build the SVM
-    clf.fit(X_train, y_train)
+    # Find the Hyperparameters and build the SVM
+    if X_search is None:
+        X_search, y_search = X_train, y_train
+    clf = svm_search(X_search, y_search, parameter_space, search_type, score,
+                     iid, n_jobs, search_kwargs=search_kwargs,
+                     memory=memory, cache_size=cache_size)
     print("Hyperparameters found:")
     print(clf.best_params_)
+    if X_search is not X_train:
+        clf.best_estimator_ = clone(clf.best_estimator_).fit(
+            X_train, y_train)
 
     # Make the predictions
     y_pred = clf.predict(X_test)
@@ -915,7 +1532,11 @@ def svm_class_and_score(
     clf_scoring(y_test, y_pred, labels)
 
     if bagged is True:
-        bgg = BaggingClassifier(base_estimator=clf)
+        # bag the best SVM found, rather than the search itself (which
+        # would re-run the whole search for every bag)
+        bgg = BaggingClassifier(
+            base_estimator=clf.best_estimator_, n_estimators=10,
+            max_samples=0.5, bootstrap=True, n_jobs=n_jobs)
         bgg.fit(X_train, y_train)
         y_pred = bgg.predict(X_test)
         print()
@@ -946,7 +1567,7 @@ def clf_scoring(y_test, y_pred, labels):
 
 
 def plot_confusion_matrix(cm, labels, title='Confusion matrix',
-                          cmap=plt.cm.Blues):
+                          cmap=plt.cm.Blues, ax=None):
     """Plots colour-mapped confusion matrix
     Parameters
     ----------
@@ -956,17 +1577,26 @@ def plot_confusion_matrix(cm, labels, title='Confusion matrix',
         list of class names for the confusion matrix
     title: string (default: Confusion Matrix)
     cmap: matplotlib colourmap scheme to be used
+    ax: matplotlib Axes object, optional
+        The axes to plot on, e.g. to reuse the same figure for several
+        confusion matrices. Defaults to the current axes.
 
     Returns
     -------
-    plot: matplotlib.pyplot.imshow object
+    plot: matplotlib.image.AxesImage object
         colour-mapped confusion matrix plot
     """
-    plt.imshow(cm, interpolation='nearest', cmap=cmap)
-    plt.title(title)
-    plt.colorbar()
+    if ax is None:
+        ax = plt.gca()
+    plot = ax.imshow(cm, interpolation='nearest', cmap=cmap)
+    ax.set_title(title)
+    ax.figure.colorbar(plot, ax=ax)
     tick_marks = np.arange(len(labels))
-    plt.xticks(tick_marks, labels, rotation=45)
-    plt.yticks(tick_marks, labels)
-    plt.ylabel('True label')
-    plt.xlabel('Predicted label')
+    ax.set_xticks(tick_marks)
+    ax.set_xticklabels(labels, rotation=45)
+    ax.set_yticks(tick_marks)
+    ax.set_yticklabels(labels)
+    ax.set_ylabel('True label')
+    ax.set_xlabel('Predicted label')
+
+    return plot